@@ -0,0 +1,284 @@
+"""Monte Carlo tree search advisor for the current phase's decisions.
+
+The tree covers the moves left in the current phase: at Night which person to
+write, with which cause and time, and when to stop using slots; by Day which
+people to research and which of study/family/social/patrol to spend points on.
+Each leaf is scored by a short greedy rollout (finish the phase, then
+`horizon` whole days) as  Δjustice − λ·Δsuspicion, with arrest costing
+`ARREST_PENALTY`.
+
+Search is root-parallel: every worker runs an independent tree from the same
+pickled state for one time slice, and the root statistics are merged. The
+`Advisor` repeats slices on a background thread until its budget runs out,
+publishing the best move so far after each one.
+
+    python advisor.py --seed 7 --budget 2
+"""
+import argparse
+import math
+import os
+import pickle
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import engine as rules
+import simulate
+
+SHORTLIST = 6
+CAUSE_CHOICES = 2
+TIME_CHOICES = 2
+ARREST_PENALTY = 100.0
+REWARD_SCALE = 20.0
+PHASE_END = ("night", "end_of_day")
+DAY_MOVES = ("study", "family", "social", "patrol")
+
+
+def _knows(gs, p):
+    return not p.has_alias or p.real_name_known or gs.have_eyes
+
+
+def _shortlist(gs, k=SHORTLIST):
+    alive = [(rules.justice_score(p, gs.have_eyes), i) for i, p in enumerate(gs.city_people) if p.alive]
+    alive.sort(key=lambda t: (-t[0], t[1]))
+    return [i for _, i in alive[:k]]
+
+
+def _fresh(options, used, k, offset):
+    # least-repeated first: options not used tonight, rotated by day so nights differ
+    order = options[offset % len(options):]+options[:offset % len(options)]
+    return ([o for o in order if o not in used]+[o for o in order if o in used])[:k]
+
+
+def candidate_moves(gs, written=()):
+    """Moves from `gs`; `written` holds the (cause, time) pairs already used tonight."""
+    if gs.phase == "Night":
+        moves = [("end_of_day",)]
+        if gs.entries_today >= rules.MAX_WRITES_PER_DAY:
+            return moves
+        causes = _fresh([c for c in rules.CAUSES if c != "unknown"], {c for c, _ in written}, CAUSE_CHOICES, gs.day*3)
+        times = _fresh([t for t in rules.TIMES if t != "random"], {t for _, t in written}, TIME_CHOICES, gs.day)
+        for i in _shortlist(gs):
+            if _knows(gs, gs.city_people[i]):
+                moves += [("write", i, c, t) for c in causes for t in times]
+        return moves
+    moves = [("night",)]
+    if gs.action_points > 0:
+        moves += [(m,) for m in DAY_MOVES]
+    for i in _shortlist(gs):
+        p = gs.city_people[i]
+        if not p.real_name_known and gs.intel_points >= (1 if gs.have_eyes else p.intel_req):
+            moves.append(("research", i))
+    return moves
+
+
+def apply_move(gs, move):
+    name = move[0]
+    if name == "write":
+        return rules.apply_action(gs, name, move[1], move[2], move[3])
+    return rules.apply_action(gs, name, move[1] if len(move) > 1 else None)
+
+
+def describe_move(gs, move):
+    name = move[0]
+    if name == "write":
+        return f"Write {gs.city_people[move[1]].name} — {move[2]} @ {move[3]}"
+    if name == "research":
+        return f"Research {gs.city_people[move[1]].name}"
+    if name == "end_of_day":
+        return "Stop writing, end the day"
+    if name == "night":
+        return "End the day's actions, go to Night"
+    return name.capitalize()
+
+
+def _greedy_night(gs):
+    slots = rules.MAX_WRITES_PER_DAY-gs.entries_today
+    picks = [i for i in _shortlist(gs) if _knows(gs, gs.city_people[i])][:max(0, slots)]
+    rules.resolve_night(gs, [(gs.city_people[i], *simulate._spread(gs, gs.entries_today+n)) for n, i in enumerate(picks)])
+    rules.end_of_day(gs)
+
+
+def rollout(gs, horizon, new_day=False):
+    """Play the rest of the current phase greedily, then `horizon` greedy days."""
+    if gs.phase == "Day" and not new_day:
+        while gs.action_points > 0:
+            rules.study(gs)
+        rules.begin_night(gs)
+    if gs.phase == "Night":
+        _greedy_night(gs)
+    for _ in range(horizon):
+        if gs.inv.game_over() or gs.day > rules.DAYS_LIMIT:
+            break
+        simulate.policy_greedy(gs)
+
+
+class _Node:
+    __slots__ = ("moves", "children", "visits", "total")
+
+    def __init__(self):
+        self.moves = None; self.children = {}; self.visits = 0; self.total = 0.0
+
+
+class _SharedStreams:
+    """Every subsystem stream is the search's own Random: no reseeding per rollout."""
+
+    def __init__(self, r):
+        self.r = r
+
+    def __getattr__(self, name):
+        return self.r
+
+    def stream(self, name):
+        return self.r
+
+
+def freeze(gs):
+    """Pickle `gs` for searching, without its RNG streams (rollouts bring their own)."""
+    rng, gs.rng = gs.rng, None
+    try:
+        return pickle.dumps(gs)
+    finally:
+        gs.rng = rng
+
+
+def _load(state, rng):
+    gs = pickle.loads(state)
+    gs.news.archive = None  # rollouts must not write to the player's archive
+    gs.rng = _SharedStreams(rng)
+    return gs
+
+
+def search(state, seed, budget, horizon=2, lam=1.0, c=1.4):
+    """One tree for `budget` seconds from a `freeze`d GameState; returns {move: (visits, total reward)}."""
+    rng = random.Random(seed)
+    root = _Node()
+    deadline = time.perf_counter()+budget
+    while time.perf_counter() < deadline:
+        gs = _load(state, rng)
+        j0, s0 = gs.justice, gs.inv.suspicion
+        node, path, written, last = root, [root], [], None
+        while last not in PHASE_END:
+            if node.moves is None:
+                node.moves = candidate_moves(gs, written)
+            untried = [m for m in node.moves if m not in node.children]
+            if untried:
+                move = rng.choice(untried)
+                node.children[move] = _Node()
+            else:
+                log_n = math.log(node.visits)
+                move = max(node.moves, key=lambda m: node.children[m].total/node.children[m].visits
+                           + c*math.sqrt(log_n/node.children[m].visits))
+            apply_move(gs, move)
+            if move[0] == "write": written.append(move[2:])
+            node = node.children[move]; path.append(node); last = move[0]
+            if untried: break
+        rollout(gs, horizon, new_day=last == "end_of_day")
+        reward = (gs.justice-j0-lam*(gs.inv.suspicion-s0)-(ARREST_PENALTY if gs.inv.game_over() else 0))/REWARD_SCALE
+        for n in path:
+            n.visits += 1; n.total += reward
+    return {m: (n.visits, n.total*REWARD_SCALE) for m, n in root.children.items()}
+
+
+def _search_job(args):
+    return search(*args)
+
+
+def rank(stats):
+    """[(move, visits, mean reward)] most visited first."""
+    return sorted(((m, v, t/v) for m, (v, t) in stats.items() if v), key=lambda r: (-r[1], -r[2]))
+
+
+class Advisor:
+    """Runs `search` slices across a process pool until `budget` seconds are spent.
+
+    `best()` is safe to call from the UI thread at any time; `on_update` is
+    called (from the worker thread) after every merged slice and once more
+    when the search ends, with `done` set and `error` holding the exception
+    if it failed (e.g. a broken process pool, which is then discarded).
+    """
+
+    def __init__(self, workers=None, budget=2.0, slice_s=0.25, horizon=2, lam=1.0, on_update=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.budget = budget; self.slice_s = slice_s; self.horizon = horizon; self.lam = lam
+        self.on_update = on_update
+        self._pool = None; self._thread = None; self._stop = threading.Event(); self._lock = threading.Lock()
+        self.stats = {}; self.iterations = 0; self.done = True; self.error = None
+
+    def start(self, gs, seed=None):
+        self.stop()
+        state = freeze(gs)
+        with self._lock:
+            self.stats = {}; self.iterations = 0; self.done = False; self.error = None
+        self._stop.clear()
+        if self.workers > 1 and self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        seed = random.getrandbits(32) if seed is None else seed
+        self._thread = threading.Thread(target=self._run, args=(state, seed), daemon=True)
+        self._thread.start()
+
+    def _run(self, state, seed):
+        deadline = time.perf_counter()+self.budget; k = 0
+        try:
+            while not self._stop.is_set() and time.perf_counter() < deadline:
+                jobs = [(state, seed*1000003+k*self.workers+w, self.slice_s, self.horizon, self.lam) for w in range(self.workers)]
+                k += 1
+                parts = self._pool.map(_search_job, jobs) if self._pool else map(_search_job, jobs)
+                with self._lock:
+                    for part in parts:
+                        for m, (v, t) in part.items():
+                            ov, ot = self.stats.get(m, (0, 0.0))
+                            self.stats[m] = (ov+v, ot+t); self.iterations += v
+                if self.on_update: self.on_update()
+        except Exception as e:
+            self.error = e
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True); self._pool = None
+        finally:
+            with self._lock:
+                self.done = True
+            if self.on_update: self.on_update()
+
+    def best(self, k=5):
+        with self._lock:
+            return rank(self.stats)[:k]
+
+    def wait(self):
+        """Block until the search has spent its budget (or failed)."""
+        if self._thread is not None:
+            self._thread.join(); self._thread = None
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(); self._thread = None
+
+    def close(self):
+        self.stop()
+        if self._pool is not None:
+            self._pool.shutdown(); self._pool = None
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--budget", type=float, default=2.0, help="seconds to search")
+    ap.add_argument("--workers", type=int, default=0, help="worker processes (default: all cores)")
+    ap.add_argument("--night", action="store_true", help="advise on the first night instead of the first day")
+    args = ap.parse_args(argv)
+    gs = rules.new_game(args.seed)
+    if args.night:
+        rules.begin_night(gs)
+        for p in gs.city_people: p.real_name_known = True
+    adv = Advisor(args.workers or None, args.budget)
+    adv.start(gs, args.seed); adv.wait(); adv.close()
+    if adv.error is not None:
+        raise SystemExit(f"search failed: {adv.error!r}")
+    print(f"{adv.iterations} rollouts on {adv.workers} worker(s)")
+    for m, v, mean in adv.best(8):
+        print(f"{v:6d}  {mean:+7.2f}  {describe_move(gs, m)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Surface caches for the GUI's animation assets and the preprocessed portrait."""
+import hashlib
+import os
+import struct
+
+import pygame
+
+
+class AnimCache:
+    """Surfaces for each kill-animation type, built once per window size and reused across frames and kills."""
+
+    def __init__(self, build):
+        self.build = build; self.size = None; self.sets = {}
+        self.builds = 0
+
+    def get(self, typ, size):
+        if size != self.size:
+            self.clear(); self.size = size
+        assets = self.sets.get(typ)
+        if assets is None:
+            assets = self.sets[typ] = self.build(typ, size)
+            self.builds += 1
+        return assets
+
+    def clear(self):
+        self.sets.clear()
+
+
+def tint_overlay(overlay, rgb, alpha):
+    """Fill-once overlay: refill only when the colour changes, fade with surface alpha."""
+    if overlay.get_at((0, 0))[:3] != tuple(rgb):
+        overlay.fill(rgb)
+    overlay.set_alpha(alpha)
+    return overlay
+
+
+PORTRAIT_MAGIC = b"DNPX2"
+_HEADER = struct.Struct("<5sqq20sHHHH3B")  # magic, mtime, size, sha1, w, h, small w, small h, tint
+
+
+def make_tinted(surf, tint_rgb):
+    tmp = surf.copy()
+    overlay = pygame.Surface(surf.get_size())
+    overlay.fill(tint_rgb)
+    tmp.blit(overlay, (0,0), special_flags=pygame.BLEND_RGBA_MULT)
+    return tmp
+
+
+def _sha1(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).digest()
+
+
+def _surface(buf, size):
+    surf = pygame.image.frombuffer(buf, size, "RGBA")
+    return surf.convert_alpha() if pygame.display.get_surface() else surf.copy()
+
+
+def _tobytes(surf):
+    return getattr(pygame.image, "tobytes", getattr(pygame.image, "tostring", None))(surf, "RGBA")
+
+
+def load_portrait(src, cache_dir=".cache", small=(64,64), size=(180,180), tint=(200,40,40)):
+    """(portrait, flash) for `src`, pixelated to `small` and scaled to `size`.
+
+    The processed pixels live in a raw RGBA cache file keyed on the source's
+    mtime and size, with a SHA-1 fallback so a touched but unchanged file does
+    not force a PNG decode; a cache made with another `size`, `small` or
+    `tint` is stale. Returns None when `src` is missing.
+    """
+    try:
+        st = os.stat(src)
+    except OSError:
+        return None
+    cache = os.path.join(cache_dir, f"{os.path.basename(src)}.{size[0]}x{size[1]}.rgba")
+    digest = None
+    try:
+        with open(cache, "rb") as f:
+            data = f.read()
+        magic, mtime, fsize, sha, w, h, *params = _HEADER.unpack_from(data)
+        if magic == PORTRAIT_MAGIC and [w, h, *params] == [*size, *small, *tint] and len(data) == _HEADER.size+8*w*h:
+            if (mtime, fsize) != (st.st_mtime_ns, st.st_size):
+                digest = _sha1(src)
+                if digest != sha:
+                    raise ValueError("stale portrait cache")
+                with open(cache, "r+b") as f:
+                    f.write(_HEADER.pack(magic, st.st_mtime_ns, st.st_size, sha, w, h, *params))
+            view = memoryview(data)[_HEADER.size:]
+            return _surface(view[:4*w*h], size), _surface(view[4*w*h:], size)
+    except (OSError, ValueError, struct.error):
+        pass
+    img = pygame.image.load(src)
+    if pygame.display.get_surface(): img = img.convert_alpha()
+    portrait = pygame.transform.scale(pygame.transform.scale(img, small), size)
+    flash = make_tinted(portrait, tint)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = cache+".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(PORTRAIT_MAGIC, st.st_mtime_ns, st.st_size, digest or _sha1(src), *size, *small, *tint))
+            f.write(_tobytes(portrait)); f.write(_tobytes(flash))
+        os.replace(tmp, cache)
+    except OSError:
+        pass
+    return _surface(_tobytes(portrait), size), _surface(_tobytes(flash), size)
@@ -0,0 +1,47 @@
+"""Import-time budget for the rules engine.
+
+Runs `import engine` in fresh interpreters and fails when the best-of-N
+self-import cost exceeds the budget or when pygame gets pulled in.
+
+    python bench/import_time.py --budget-ms 60
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_cost_us(module, runs=7):
+    best = None
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}; import sys; "
+                              "print('pygame' in sys.modules)"], cwd=ROOT, capture_output=True, text=True, check=True)
+        cum = int(re.search(r"import time:\s+\d+ \|\s+(\d+) \| %s$" % module, out.stderr, re.M).group(1))
+        best = cum if best is None else min(best, cum)
+        pulled = out.stdout.strip() == "True"
+    return best, pulled
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--budget-ms", type=float, default=60.0)
+    ap.add_argument("--runs", type=int, default=7)
+    args = ap.parse_args(argv)
+    us, pulled = import_cost_us("engine", args.runs)
+    print(f"import engine: {us/1000:.2f} ms (budget {args.budget_ms:.1f} ms), pygame imported: {pulled}")
+    try:
+        pg, _ = import_cost_us("pygame", args.runs)
+        print(f"import pygame (for reference): {pg/1000:.2f} ms")
+    except subprocess.CalledProcessError:
+        pass
+    if pulled or us/1000 > args.budget_ms:
+        print("FAIL: engine import over budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""Bytes per person for each population representation.
+
+    python bench/memory.py --sizes 10000 100000 1000000
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import engine
+from population_lazy import LazyPopulation
+
+
+def _lazy(n):
+    pop = LazyPopulation(0, n)
+    return pop, pop.top(18)  # the shortlist the window materializes at startup
+
+
+BACKENDS = {
+    "dataclass": lambda n: engine.gen_population(n),
+    "compact": lambda n: engine.gen_population(n, compact=True),
+    "lazy": _lazy,
+}
+try:
+    from population_np import Population
+    BACKENDS["numpy"] = lambda n: Population.generate(n, seed=0)
+except ImportError:
+    pass
+
+
+def measure(build, n):
+    random.seed(0)
+    gc.collect()
+    tracemalloc.start()
+    pop = build(n)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del pop
+    return size/n
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=list(BACKENDS))
+    args = ap.parse_args(argv)
+    print(f"{'people':>10} " + " ".join(f"{b:>12}" for b in args.backends) + "   (bytes/person)")
+    for n in args.sizes:
+        row = [measure(BACKENDS[b], n) for b in args.backends]
+        print(f"{n:>10} " + " ".join(f"{v:>12.1f}" for v in row))
+
+
+if __name__ == "__main__":
+    main()
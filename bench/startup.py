@@ -0,0 +1,52 @@
+"""Cold vs warm startup: Game construction plus the first frame that needs the portrait.
+
+    python bench/startup.py
+
+The probe runs in a scratch directory holding a copy of the real portrait, so
+the real saves and portrait cache are left alone; the directory is removed
+afterwards.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r'''
+import os, sys, time, importlib.util
+t0 = time.perf_counter()
+sys.path.insert(0, os.path.dirname(sys.argv[1]))
+spec = importlib.util.spec_from_file_location("dn", sys.argv[1])
+dn = importlib.util.module_from_spec(spec); spec.loader.exec_module(dn)
+g = dn.Game(); g.render()
+t1 = time.perf_counter()
+g.light_flash
+t2 = time.perf_counter()
+print(f"{(t1-t0)*1000:.1f} {(t2-t1)*1000:.1f}")
+'''
+
+
+def run(cwd):
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    out = subprocess.run([sys.executable, "-c", PROBE, os.path.join(ROOT, "death note main.py")], cwd=cwd, env=env,
+                         capture_output=True, text=True, check=True)
+    return [float(x) for x in out.stdout.split()[-2:]]
+
+
+def main(runs=5):
+    scratch = tempfile.mkdtemp(prefix="dn-startup-")
+    try:
+        shutil.copy(os.path.join(ROOT, "light.png"), scratch)  # the GUI loads its portrait from the cwd
+        cold = run(scratch)  # no .cache yet
+        warm = min((run(scratch) for _ in range(runs)), key=sum)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    print(f"{'':>6} {'first frame':>12} {'portrait':>10}   (ms)")
+    print(f"{'cold':>6} {cold[0]:>12.1f} {cold[1]:>10.1f}")
+    print(f"{'warm':>6} {warm[0]:>12.1f} {warm[1]:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
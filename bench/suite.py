@@ -0,0 +1,180 @@
+"""Engine and rendering hot-path benchmarks with a JSON baseline to compare against.
+
+    python bench/suite.py --out bench/baseline.json           # record
+    python bench/suite.py --compare bench/baseline.json       # exit 1 on regressions
+
+Every case is seeded. Rendering cases draw on SDL's dummy video driver, and the
+Game is built in a scratch directory (with a copy of the real portrait asset)
+so the real saves are left alone; the directory is removed afterwards.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy"); os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import engine
+import simulate
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def engine_cases():
+    cases = {}
+    for n in SIZES:
+        cases[f"gen_population[{n}]"] = (lambda n=n: engine.gen_population(n, rng=random.Random(0)), None)
+        cases[f"gen_population_compact[{n}]"] = (lambda n=n: engine.gen_population(n, compact=True, rng=random.Random(0)), None)
+        cases[f"lazy_open_top18[{n}]"] = (lambda n=n: engine.new_game(0, n, lazy=True).city_people.top(18), None)
+
+    def day_cycle_setup():
+        gs = engine.new_game(0, 50)
+        for p in gs.city_people: p.real_name_known = True
+        return gs
+
+    def day_cycle(gs):
+        # one night of writes, then the day turnover; resurrect when everyone is gone
+        engine.begin_night(gs)
+        for p in simulate._targets(gs)[:engine.MAX_WRITES_PER_DAY]:
+            engine.resolve_write(gs, p, *simulate._spread(gs, gs.entries_today))
+        engine.end_of_day(gs)
+        gs.inv.suspicion = 15
+        if sum(p.alive for p in gs.city_people) < engine.MAX_WRITES_PER_DAY:
+            for p in gs.city_people: p.alive = True
+    cases["day_cycle[50]"] = (day_cycle, day_cycle_setup)
+    return cases
+
+
+def render_cases():
+    import importlib.util
+    import pygame
+    spec = importlib.util.spec_from_file_location("dn_main", os.path.join(ROOT, "death note main.py"))
+    dn = importlib.util.module_from_spec(spec); spec.loader.exec_module(dn)
+    cwd, scratch = os.getcwd(), tempfile.mkdtemp(prefix="dn-bench-")
+    shutil.copy(os.path.join(ROOT, "light.png"), scratch)  # the GUI loads its portrait from the cwd
+    os.chdir(scratch)
+    g = dn.Game(seed=0)
+    g.selected = g.ranked.top(1)[0]
+    g.render()
+
+    def anim(typ, cause):
+        def setup():
+            g.anim_active = False; g.start_kill_animation(g.selected, cause, "07:00")
+            g.anim_data["start"] = pygame.time.get_ticks()-300  # mid-flash, the heaviest frame
+            if g.anim_data["type"] != typ:
+                raise ValueError(f"{cause!r} now plays a {g.anim_data['type']!r} animation, not {typ!r}")
+            return typ
+        return setup
+
+    def draw_anim(_):
+        g.draw_kill_animation_overlay(g.screen)
+
+    cases = {
+        "refresh_lists": (g.refresh_lists, None),
+        "scrolllist_draw": (lambda: (g.list_news.draw(g.screen, g.font, g.font_small),
+                                     g.list_people.draw(g.screen, g.font, g.font_small)), None),
+        "draw_columns": (g.draw_columns, None),
+    }
+    for typ, cause in (("heart", "heart attack"), ("accident", "accident"), ("fade", "illness")):
+        cases[f"anim_overlay[{typ}]"] = (draw_anim, anim(typ, cause))
+    def close():
+        try:
+            g.anim_active = False; g.save.close(); pygame.quit()
+        finally:
+            os.chdir(cwd); shutil.rmtree(scratch, ignore_errors=True)
+    return cases, close
+
+
+def measure(fn, setup=None, repeat=5, min_time=0.1):
+    """Median and min seconds per call over `repeat` runs, each long enough to reach `min_time`."""
+    arg = setup() if setup else None
+    call = (lambda: fn(arg)) if setup else fn
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number): call()
+        if time.perf_counter()-t0 >= min_time/5 or number >= 1 << 20: break
+        number *= 2
+    runs = []
+    for _ in range(repeat):
+        if setup: arg = setup()
+        t0 = time.perf_counter()
+        for _ in range(number): call()
+        runs.append((time.perf_counter()-t0)/number)
+    return {"median_us": statistics.median(runs)*1e6, "min_us": min(runs)*1e6, "number": number, "repeat": repeat}
+
+
+def run(select=None, repeat=5, min_time=0.1, render=True):
+    cases = engine_cases(); close = None
+    if render:
+        rc, close = render_cases(); cases.update(rc)
+    results = {}
+    try:
+        for name, (fn, setup) in cases.items():
+            if select and not any(s in name for s in select): continue
+            results[name] = r = measure(fn, setup, repeat, min_time)
+            print(f"{name:<34} {r['median_us']:>12.1f} us  (min {r['min_us']:.1f}, x{r['number']})", flush=True)
+    finally:
+        if close: close()
+    return results
+
+
+def meta():
+    import pygame
+    return {"python": platform.python_version(), "pygame": pygame.version.ver, "platform": platform.platform(),
+            "machine": platform.machine(), "cpus": os.cpu_count(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def compare(results, baseline, threshold):
+    """[(name, baseline us, current us, ratio)] for cases slower than baseline by more than `threshold`.
+
+    Compares the best run of each case: the median carries scheduler noise.
+    """
+    worse = []
+    print(f"\n{'case':<34} {'baseline':>10} {'now':>10} {'ratio':>7}")
+    for name, r in results.items():
+        b = baseline.get(name)
+        if b is None:
+            print(f"{name:<34} {'-':>10} {r['min_us']:>10.1f}   (new)"); continue
+        ratio = r["min_us"]/b["min_us"]
+        flag = "  REGRESSION" if ratio > 1+threshold else "  faster" if ratio < 1/(1+threshold) else ""
+        print(f"{name:<34} {b['min_us']:>10.1f} {r['min_us']:>10.1f} {ratio:>7.2f}{flag}")
+        if flag == "  REGRESSION": worse.append((name, b["min_us"], r["min_us"], ratio))
+    return worse
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--compare", metavar="BASELINE", help="baseline JSON from an earlier --out")
+    ap.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before flagging (default 15%%)")
+    ap.add_argument("--select", nargs="*", help="only cases whose name contains one of these")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--min-time", type=float, default=0.1, help="target seconds per run")
+    ap.add_argument("--no-render", action="store_true", help="skip the pygame cases")
+    args = ap.parse_args(argv)
+    out = args.out and os.path.abspath(args.out); base = args.compare and os.path.abspath(args.compare)
+    results = run(args.select, args.repeat, args.min_time, not args.no_render)
+    if out:
+        with open(out, "w") as f:
+            json.dump({"meta": meta(), "results": results}, f, indent=1)
+    if base:
+        with open(base) as f:
+            worse = compare(results, json.load(f)["results"], args.threshold)
+        if worse:
+            print(f"\n{len(worse)} regression(s) over {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
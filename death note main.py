@@ -1,26 +1,24 @@
 import pygame
-import random
+import argparse
 import sys
 import math
-from dataclasses import dataclass, field
-from typing import List, Optional, Tuple
+import os
+from textcache import render_text
+from scheduler import FrameScheduler
+from indexes import RankedIndex, SecondaryIndexes
+from newsfeed import NewsArchive, NewsFeed
+from assets import AnimCache, tint_overlay, load_portrait, make_tinted
+from savegame import SaveLog, resume as resume_save
+from timeline import Timeline
+from advisor import Advisor, describe_move
+from profiler import Profiler
+from population_lazy import SELECT_LIMIT
+from engine import CAUSES, TIMES, CITIES, MAX_WRITES_PER_DAY, Person, new_game, apply_action, resolve_night
 
 WIDTH, HEIGHT = 1280, 760
 FPS = 60
-
-DAYS_LIMIT = 40
-START_INTEL = 3
-JUSTICE_WIN = 140
-MAX_SUSPICION = 100
-DAILY_ACTION_POINTS = 3
-MAX_WRITES_PER_DAY = 3
-
-CAUSES = [
-    "heart attack", "accident", "illness", "fall", "stroke",
-    "cardiac arrest", "overdose", "drowning", "unknown"
-]
-TIMES = ["07:00", "12:00", "16:00", "20:00", "23:59", "random"]
-CITIES = ["Tokyo","Osaka","Sapporo","Sendai","Nagoya","Kyoto","Yokohama","Fukuoka"]
+ADVISOR_EVENT = pygame.USEREVENT+1
+PROFILE_PHASES = ("events","anim_update","draw","modal","anim_overlay","flip")
 
 BG = (15,18,24)
 PANEL = (26,32,44)
@@ -33,217 +31,87 @@ OUT = (55,62,76)
 BTN = (40,48,64)
 BTN_H = (56,66,88)
 
-pygame.init()
-
-@dataclass
-class Person:
-    name: str
-    city: str
-    crime: Optional[str]
-    guilt: int
-    notoriety: int
-    has_alias: bool
-    intel_req: int
-    real_name_known: bool = False
-    alive: bool = True
-
-    def is_criminal(self):
-        return self.crime is not None and self.guilt >= 5
-
-@dataclass
-class Investigator:
-    suspicion: int = 15
-
-    def add_suspicion(self, amt: int):
-        self.suspicion = max(0, min(MAX_SUSPICION, self.suspicion + amt))
-
-    def game_over(self) -> bool:
-        return self.suspicion >= MAX_SUSPICION
-
-@dataclass
-class GameState:
-    day: int = 1
-    phase: str = "Day"
-    justice: float = 0.0
-    intel_points: int = START_INTEL
-    entries_today: int = 0
-    action_points: int = DAILY_ACTION_POINTS
-    have_eyes: bool = False
-    city_people: List[Person] = field(default_factory=list)
-    inv: Investigator = field(default_factory=Investigator)
-    news: List[str] = field(default_factory=list)
-    pattern_memory: List[Tuple[str,str,str]] = field(default_factory=list)
-    confidants: dict = field(default_factory=lambda: {"Ryuk":1, "Misa":0})
-    stats: dict = field(default_factory=lambda: {"Intelligence":1, "Charisma":1, "Courage":1})
-
-    def add_news(self, s: str):
-        self.news.append(s)
-        if len(self.news)>50: self.news.pop(0)
-
-def japanese_name_pool():
-    surnames = ["Yagami","Amane","Aizawa","Matsuda","Takada","Sato","Suzuki","Tanaka","Watanabe","Takahashi","Ito","Yamada","Nakamura","Kobayashi"]
-    given = ["Light","Sachiko","Kenji","Naoki","Haruka","Ryo","Yumi","Shinji","Aya","Takuya","Rei","Kenta","Naomi","Akira"]
-    pool = [f"{s} {g}" for s in surnames for g in random.sample(given,k=6)]
-    random.shuffle(pool)
-    return pool
-
-CRIMES = ["armed robbery","extortion","assault","kidnapping","arson","drug trafficking","embezzlement","murder","cyberfraud"]
-
-def gen_population(n=42):
-    names = japanese_name_pool()
-    people=[]
-    for i in range(n):
-        name = names.pop() if names else f"Person{i}"
-        city = random.choice(CITIES)
-        is_crim = random.random()<0.55
-        has_alias = random.random()<0.45
-        guilt = random.randint(0,10) if is_crim else random.randint(0,6)
-        notor = random.randint(0,10)
-        intel = random.randint(1,3)
-        crime = random.choice(CRIMES) if is_crim else None
-        people.append(Person(name, city, crime, guilt, notor, has_alias, intel))
-    return people
-
-def justice_score(p: Person, have_eyes: bool)->float:
-    base = max(0, p.guilt-2)*(1+p.notoriety/20)
-    if have_eyes: base *= 0.85
-    return base
-
-def resolve_write(gs: GameState, p: Person, cause: str, time_str: str):
-    if not p.alive:
-        return "Already dead"
-    if gs.entries_today>=MAX_WRITES_PER_DAY:
-        return "Notebook resists"
-
-    if p.has_alias and not (p.real_name_known or gs.have_eyes):
-        gs.inv.add_suspicion(3)
-        gs.entries_today+=1
-        gs.add_news("Strange episode, no fatality.")
-        return "Alias suspected. Suspicion +3"
-    if time_str=="random":
-        time_str = random.choice([t for t in TIMES if t!="random"])
-    p.alive=False
-    gs.entries_today+=1
-    gs.add_news(f"Death reported in {p.city}: {p.name} — {cause} @ {time_str}")
-    gs.justice += justice_score(p, gs.have_eyes)
-    gs.pattern_memory.append((cause,time_str,p.city))
-    if len(gs.pattern_memory)>7:
-        gs.pattern_memory.pop(0)
-
-    if p.guilt<=1:
-        gs.inv.add_suspicion(18)
-        gs.add_news("Outrage: possible innocent victim")
-    elif p.guilt<=3:
-        gs.inv.add_suspicion(8)
-    gs.inv.add_suspicion(max(0,p.notoriety-4)//2)
-    return "Name written."
-
-def research(gs: GameState, p: Person):
-    if gs.intel_points<=0:
-        return "No intel today"
-    cost = 1 if gs.have_eyes else p.intel_req
-    if gs.intel_points < cost:
-        return "Not enough intel"
-    gs.intel_points -= cost
-    if p.has_alias and not p.real_name_known:
-        if random.random() < (1.0 if gs.have_eyes else 0.8):
-            p.real_name_known=True
-            gs.add_news(f"Intel: {p.name} confirmed")
-            return "Real name confirmed"
-        return "Trail cold"
-    p.real_name_known=True
-    gs.add_news(f"Background check: {p.name}")
-    return "Verified"
-
-def end_of_day(gs: GameState):
-    causes={}; times={}; cities={}
-    for c,t,ci in gs.pattern_memory:
-        causes[c]=causes.get(c,0)+1; times[t]=times.get(t,0)+1; cities[ci]=cities.get(ci,0)+1
-    if causes:
-        cmax=max(causes,key=causes.get); n=causes[cmax]
-        if n>=3:
-            gs.inv.add_suspicion(3)
-            gs.add_news(f"Investigators note cause pattern: {cmax}")
-    if times:
-        tmax=max(times,key=times.get); n=times[tmax]
-        if n>=3:
-            gs.inv.add_suspicion(3)
-            gs.add_news(f"Investigators note time pattern: {tmax}")
-    if cities:
-        city=max(cities,key=cities.get); n=cities[city]
-        if n>=3:
-            gs.inv.add_suspicion(3)
-            gs.add_news(f"Cluster of deaths in {city}")
-
-    base = 4
-    if gs.entries_today == 0:
-        gs.inv.add_suspicion(-5)
-        base = 0
-    elif gs.entries_today >= 2:
-        base += 2
-    gs.inv.add_suspicion(base)
-
-    if gs.action_points > 0:
-        gs.inv.add_suspicion(6)
-
-    gs.day += 1
-    gs.entries_today = 0
-    gs.intel_points = START_INTEL + (1 if gs.have_eyes else 0)
-    gs.action_points = DAILY_ACTION_POINTS
+AUTOSAVE = os.path.join("saves","autosave.dnlog")
+
+def news_path(save): return os.path.splitext(save)[0]+".news"
+
+def rotate_autosave():
+    """Keep the last session as saves/autosave.prev.* (with its news log) instead of overwriting it."""
+    news=news_path(AUTOSAVE); prev=os.path.splitext(AUTOSAVE)[0]+".prev"
+    for cur,old in ((AUTOSAVE,prev+".dnlog"),(news,prev+".news"),(news+".idx",prev+".news.idx")):
+        if os.path.exists(cur): os.replace(cur,old)
+        elif os.path.exists(old): os.remove(old)
 
 class Button:
     def __init__(self, rect, label, cb):
-        self.rect = pygame.Rect(rect); self.label = label; self.cb = cb; self.hover=False
+        self.rect = pygame.Rect(rect); self.label = label; self.cb = cb; self.hover=False; self.dirty=True
     def draw(self,surf,font):
         col = BTN_H if self.hover else BTN
         pygame.draw.rect(surf,col,self.rect,border_radius=10)
         pygame.draw.rect(surf,OUT,self.rect,1,border_radius=10)
-        txt = font.render(self.label,True,TEXT)
+        txt = render_text(font,self.label,TEXT)
         surf.blit(txt, txt.get_rect(center=self.rect.center))
     def handle(self,event):
         if event.type==pygame.MOUSEMOTION:
-            self.hover=self.rect.collidepoint(event.pos)
+            hover=self.rect.collidepoint(event.pos)
+            if hover!=self.hover: self.hover=hover; self.dirty=True
         if event.type==pygame.MOUSEBUTTONDOWN and event.button==1 and self.rect.collidepoint(event.pos):
             self.cb()
 
 class ScrollList:
     def __init__(self, rect, row_h=52):
-        self.rect=pygame.Rect(rect); self.row_h=row_h; self.items=[]; self.scroll=0
-    def set_items(self,items): self.items=items; self.scroll=0
-    def draw(self,surf,font,font_small):
+        self.rect=pygame.Rect(rect); self.row_h=row_h; self.rows=[]; self.drawrow=None; self.click=None; self.scroll=0
+        self.hover=None; self.dirty=True
+    def set_items(self,rows,drawrow,click):
+        self.rows=rows; self.drawrow=drawrow; self.click=click; self.scroll=0; self.dirty=True
+        self.hover=self.row_at(pygame.mouse.get_pos())
+    def max_scroll(self): return max(0,len(self.rows)*self.row_h-(self.rect.h-12))
+    def row_at(self,pos):
+        if not self.rect.collidepoint(pos): return None
+        idx=(pos[1]-(self.rect.y+6)+self.scroll)//self.row_h
+        return idx if 0<=idx<len(self.rows) else None
+    def draw_frame(self,surf):
         pygame.draw.rect(surf,PANEL,self.rect,border_radius=12); pygame.draw.rect(surf,OUT,self.rect,1,border_radius=12)
-        clip=surf.get_clip(); surf.set_clip(self.rect.inflate(-6,-6))
-        y=self.rect.y+6-self.scroll; mx,my=pygame.mouse.get_pos()
-        for i,(drawfn,_) in enumerate(self.items):
+    def draw(self,surf,font,font_small):
+        clip=surf.get_clip(); surf.set_clip(self.rect.inflate(-6,-6).clip(clip))
+        first=self.scroll//self.row_h; last=min(len(self.rows),(self.scroll+self.rect.h)//self.row_h+1)
+        hover=self.hover
+        y=self.rect.y+6-self.scroll+first*self.row_h
+        for i in range(first,last):
             r=pygame.Rect(self.rect.x+6,y,self.rect.w-12,self.row_h-6)
-            hover=r.collidepoint((mx,my))
-            pygame.draw.rect(surf,PANEL if not hover else (32,40,54),r,border_radius=8)
+            pygame.draw.rect(surf,PANEL if i!=hover else (32,40,54),r,border_radius=8)
             pygame.draw.rect(surf,OUT,r,1,border_radius=8)
-            drawfn(surf,r)
+            self.drawrow(surf,r,self.rows[i])
             y+=self.row_h
         surf.set_clip(clip)
     def handle(self,event):
+        if event.type==pygame.MOUSEMOTION:
+            hover=self.row_at(event.pos)
+            if hover!=self.hover: self.hover=hover; self.dirty=True
         if event.type==pygame.MOUSEWHEEL:
-            self.scroll=max(0,self.scroll-event.y*(self.row_h//2))
-        if event.type==pygame.MOUSEBUTTONDOWN and event.button==1 and self.rect.collidepoint(event.pos):
-            idx=(event.pos[1]-(self.rect.y+6)+self.scroll)//self.row_h
-            if 0<=idx<len(self.items):
-                _,cb=self.items[idx]; cb()
+            scroll=min(self.max_scroll(),max(0,self.scroll-event.y*(self.row_h//2)))
+            if scroll!=self.scroll: self.scroll=scroll; self.hover=self.row_at(pygame.mouse.get_pos()); self.dirty=True
+        if event.type==pygame.MOUSEBUTTONDOWN and event.button==1:
+            idx=self.row_at(event.pos)
+            if idx is not None: self.click(self.rows[idx])
 
 class Modal:
-    def __init__(self,size): self.size=size; self.visible=False; self.title=""; self.lines=[]; self.buttons=[]
+    def __init__(self,size): self.size=size; self.visible=False; self.title=""; self.lines=[]; self.buttons=[]; self.overlay=None
     def open(self,title,lines,actions):
         self.visible=True; self.title=title; self.lines=lines;
         self.buttons=[Button((0,0,140,36),lbl,cb) for lbl,cb in actions]
     def close(self): self.visible=False
     def draw(self,surf,font_big,font):
         if not self.visible: return
-        sw,sh=surf.get_size(); ov=pygame.Surface((sw,sh),pygame.SRCALPHA); ov.fill((0,0,0,180)); surf.blit(ov,(0,0))
+        sw,sh=surf.get_size()
+        if self.overlay is None or self.overlay.get_size()!=(sw,sh):
+            self.overlay=pygame.Surface((sw,sh)).convert(); self.overlay.fill((0,0,0)); self.overlay.set_alpha(180)
+        surf.blit(self.overlay,(0,0))
         w,h=self.size; rect=pygame.Rect((sw-w)//2,(sh-h)//2,w,h)
         pygame.draw.rect(surf,PANEL,rect,border_radius=12); pygame.draw.rect(surf,OUT,rect,2,border_radius=12)
-        surf.blit(font_big.render(self.title,True,TEXT),(rect.x+18,rect.y+14))
+        surf.blit(render_text(font_big,self.title,TEXT),(rect.x+18,rect.y+14))
         y=rect.y+56
-        for ln in self.lines: surf.blit(font.render(ln,True,TEXT),(rect.x+18,y)); y+=26
+        for ln in self.lines: surf.blit(render_text(font,ln,TEXT),(rect.x+18,y)); y+=26
         bx=rect.x+18; by=rect.bottom-56
         for b in self.buttons: b.rect.topleft=(bx,by); b.draw(surf,font); bx+=b.rect.w+12
     def handle(self,event):
@@ -251,17 +119,25 @@ class Modal:
         for b in self.buttons: b.handle(event)
 
 class Game:
-    def __init__(self):
+    def __init__(self, resume=None, seed=None, population=50, lazy=False):
+        pygame.init()
         self.screen=pygame.display.set_mode((WIDTH,HEIGHT)); pygame.display.set_caption("Death Note: Persona Edition")
-        self.clock=pygame.time.Clock();
+        self.clock=pygame.time.Clock(); self.scheduler=FrameScheduler(FPS,self.clock)
+        self.profiler=Profiler(PROFILE_PHASES,enabled=bool(os.environ.get("DN_PROFILE")))
+        self.show_profile=self.profiler.enabled; self.profile_rect=pygame.Rect(WIDTH-330,108,310,66); self._profile_lines=[]; self._profile_t=-1000
         self.font=pygame.font.Font(None,26); self.font_small=pygame.font.Font(None,20); self.font_big=pygame.font.Font(None,34)
-        self.gs=GameState(); self.modal=Modal((700,380)); self.toast=""; self.toast_t=0
+        self.modal=Modal((800,380)); self.toast=""; self.toast_t=0
 
         self.list_news=ScrollList((20,100,600,360),row_h=64)
         self.list_people=ScrollList((640,100,600,360),row_h=60)
 
         self.btn_research=Button((820,540,140,40),"Research",self._btn_research_cb)
         self.btn_write=Button((980,540,140,40),"Write Name",self._btn_write_cb)
+        self.btn_advise=Button((1140,540,100,40),"Advise",self.on_advise)
+        self.filters={"city":None,"criminal":None,"alias":None}
+        self.btn_f_city=Button((820,490,130,36),"All cities",lambda: self.cycle_filter("city",self.btn_f_city))
+        self.btn_f_crim=Button((960,490,130,36),"Anyone",lambda: self.cycle_filter("criminal",self.btn_f_crim))
+        self.btn_f_alias=Button((1100,490,130,36),"Any name",lambda: self.cycle_filter("alias",self.btn_f_alias))
 
         self.btn_study=Button((20,700-40,120,36),"Study",self.on_study)
         self.btn_family=Button((150,700-40,120,36),"Family",self.on_family)
@@ -270,27 +146,56 @@ class Game:
         self.btn_eyes=Button((540,700-40,140,36),"Shinigami Eyes",self.on_eyes)
         self.btn_rules=Button((690,700-40,100,36),"Rules",self.on_rules)
         self.btn_end=Button((810,700-40,140,36),"End Day",self.on_end_day)
-
-        self.gs.city_people=gen_population(50); self.refresh_lists(); self.selected=None
-
-        self.light_portrait = self._load_or_make_light()
-        self.light_flash = self._make_tinted(self.light_portrait, (200,40,40))
+        self.btn_news=Button((960,700-40,100,36),"News",self.on_news)
+        self.btn_undo=Button((1070,700-40,100,36),"Undo",self.on_undo)
+        self.buttons=(self.btn_f_city,self.btn_f_crim,self.btn_f_alias,self.btn_research,self.btn_write,self.btn_advise,self.btn_study,self.btn_family,self.btn_social,self.btn_patrol,self.btn_eyes,self.btn_rules,self.btn_end,self.btn_news,self.btn_undo)
+
+        self.top_rect=pygame.Rect(0,0,WIDTH,104); self.inspect_rect=pygame.Rect(20,480,1220,200)
+        self.background=self._build_background()
+        self.layers=[(self.top_rect,self.draw_top),
+                     (self.list_news.rect,lambda: self.list_news.draw(self.screen,self.font,self.font_small)),
+                     (self.list_people.rect,lambda: self.list_people.draw(self.screen,self.font,self.font_small)),
+                     (self.inspect_rect,self.draw_inspect)]
+        self.layers+=[(b.rect,lambda b=b: b.draw(self.screen,self.font)) for b in self.buttons]
+        self.dirty=[]; self.full_redraw=True; self.toast_rect=None
+
+        if resume:
+            news=news_path(resume)  # follows a save that was moved or rotated; older saves keep their recorded log
+            self.gs,self.save=resume_save(resume,archive=news if os.path.exists(news) else None)
+        else:
+            rotate_autosave()
+            self.gs=new_game(seed,population,lazy,news=NewsFeed(archive=NewsArchive(news_path(AUTOSAVE),fresh=True)))
+            self.save=SaveLog(AUTOSAVE,fresh=True); self.save.snapshot(self.gs)
+        self.index_people(); self.refresh_lists(); self.selected=None
+        self.timeline=Timeline(self.gs)
+        self.advisor=None; self.advice_for=None
+        self.night_queue=[]; self.anim_queue=[]
+
+        self._light = None
         self.anim_active = False
         self.anim_data = None
         self.anim_overlay_alpha = 0
+        self.anim_cache = AnimCache(self._build_anim_assets)
+
+    @property
+    def light_portrait(self):
+        if self._light is None: self._light = self._load_or_make_light()
+        return self._light[0]
+
+    @property
+    def light_flash(self):
+        if self._light is None: self._light = self._load_or_make_light()
+        return self._light[1]
 
     def _load_or_make_light(self):
-        TARGET = (180, 180)
-        SMALL = (64, 64)
         for fname in ("light.png",):
             try:
-                img = pygame.image.load(fname).convert_alpha()
-                small = pygame.transform.scale(img, SMALL)
-                pix = pygame.transform.scale(small, TARGET)
-                return pix
+                light = load_portrait(fname, small=(64,64), size=(180,180), tint=(200,40,40))
+                if light: return light
             except Exception:
                 pass
-        return self._make_light_pixel()
+        pix = self._make_light_pixel()
+        return pix, make_tinted(pix, (200,40,40))
 
     def _make_light_pixel(self):
         s = pygame.Surface((180,180), pygame.SRCALPHA)
@@ -307,45 +212,71 @@ class Game:
         pygame.draw.line(s,(40,40,40),(64,60),(154,60),1)
         return s
 
-    def _make_tinted(self, surf, tint_rgb):
-        w,h = surf.get_size()
-        tmp = surf.copy()
-        overlay = pygame.Surface((w,h))
-        overlay.fill(tint_rgb)
-        tmp.blit(overlay, (0,0), special_flags=pygame.BLEND_RGBA_MULT)
-        return tmp
+    def _build_background(self):
+        bg=pygame.Surface((WIDTH,HEIGHT)).convert(); bg.fill(BG)
+        pygame.draw.rect(bg,PANEL,(0,0,WIDTH,84)); pygame.draw.line(bg,OUT,(0,84),(WIDTH,84),1)
+        self.list_news.draw_frame(bg); self.list_people.draw_frame(bg)
+        pygame.draw.rect(bg,PANEL,self.inspect_rect,border_radius=12); pygame.draw.rect(bg,OUT,self.inspect_rect,1,border_radius=12)
+        return bg
 
     def toast_msg(self,msg):
-        self.toast=msg; self.toast_t=pygame.time.get_ticks()
+        self.toast=msg; self.toast_t=pygame.time.get_ticks(); self.full_redraw=True
+
+    def index_people(self):
+        if hasattr(self.gs.city_people,"overlay"):  # lazy world: the population answers the same queries by scanning
+            self.ranked=self.secondary=self.gs.city_people; self.gs.watchers[:]=[]; return
+        self.ranked=RankedIndex(self.gs.city_people); self.secondary=SecondaryIndexes(self.gs.city_people)
+        self.gs.watchers[:]=[self.ranked,self.secondary]
 
     def refresh_lists(self):
-        alive=[p for p in self.gs.city_people if p.alive]
-        items=[]
-        for p in alive:
-            def make_draw(pp=p):
-                def draw(surf,r):
-                    surf.blit(self.font.render(f"{pp.name} — {pp.city}",True,TEXT),(r.x+8,r.y+6))
-                    surf.blit(self.font_small.render(f"{pp.crime if pp.crime else 'civilian'} | G{pp.guilt} N{pp.notoriety}",True,DIM),(r.x+8,r.y+32))
-                return draw
-            def make_click(pp=p):
-                def cb(): self.selected=pp
-                return cb
-            items.append((make_draw(),make_click()))
-        self.list_news.set_items(items)
-        shortlist=sorted(alive,key=lambda x:(not x.is_criminal(),-x.notoriety))[:18]
-        items2=[]
-        for p in shortlist:
-            def make_draw(pp=p):
-                def draw(surf,r):
-                    nm=pp.name if (not pp.has_alias or pp.real_name_known or self.gs.have_eyes) else f"(Alias) {pp.name}"
-                    surf.blit(self.font.render(nm,True,TEXT),(r.x+8,r.y+6))
-                    surf.blit(self.font_small.render(f"{pp.city} | {'criminal' if pp.is_criminal() else 'civilian'} | G{pp.guilt}",True,DIM),(r.x+8,r.y+30))
-                return draw
-            def make_click(pp=p):
-                def cb(): self.selected=pp
-                return cb
-            items2.append((make_draw(),make_click()))
-        self.list_people.set_items(items2)
+        self.list_news.set_items(self.secondary.alive_people(),self._draw_person_row,self._select)
+        if any(v is not None for v in self.filters.values()):
+            people=self.secondary.select(**self.filters)
+        else:
+            people=self.ranked.top(18)
+        self.list_people.set_items(people,self._draw_target_row,self._select)
+
+    FILTER_CHOICES = {"city":[(None,"All cities")]+[(c,c) for c in CITIES],
+                      "criminal":[(None,"Anyone"),(True,"Criminals"),(False,"Civilians")],
+                      "alias":[(None,"Any name"),("unknown","Aliases"),("known","Known"),("plain","No alias")]}
+
+    def cycle_filter(self, dim, btn):
+        choices=self.FILTER_CHOICES[dim]
+        i=next(i for i,(v,_) in enumerate(choices) if v==self.filters[dim])
+        self.filters[dim],btn.label=choices[(i+1)%len(choices)]; btn.dirty=True
+        self.refresh_lists()
+        if any(v is not None for v in self.filters.values()):
+            n=len(self.list_people.rows); more=self.secondary is self.gs.city_people and n>=SELECT_LIMIT
+            self.toast_msg(f"{n}{'+' if more else ''} alive match")
+        else: self.toast_msg("Showing the top targets")
+
+    def _select(self,p): self.selected=p
+
+    def act(self, name, p=None, cause=None, time_str=None):
+        """Apply a rule and append it to the save log."""
+        pos=None if p is None else self.ranked.pos[id(p)]
+        if self.advisor: self.advisor.stop()
+        msg=apply_action(self.gs,name,pos,cause,time_str)
+        self.save.record(self.gs,name,pos,cause,time_str)
+        self.timeline.checkpoint(name)
+        return msg
+
+    def act_night(self, entries):
+        """Resolve a night's queued (person, cause, time) writes at once and log them as one batch."""
+        if self.advisor: self.advisor.stop()
+        msgs=resolve_night(self.gs,entries)
+        self.save.record_night(self.gs,[(self.ranked.pos[id(p)],c,t) for p,c,t in entries])
+        self.timeline.checkpoint("night writes")
+        return msgs
+
+    def _draw_person_row(self,surf,r,pp):
+        surf.blit(render_text(self.font,f"{pp.name} — {pp.city}",TEXT),(r.x+8,r.y+6))
+        surf.blit(render_text(self.font_small,f"{pp.crime if pp.crime else 'civilian'} | G{pp.guilt} N{pp.notoriety}",DIM),(r.x+8,r.y+32))
+
+    def _draw_target_row(self,surf,r,pp):
+        nm=pp.name if (not pp.has_alias or pp.real_name_known or self.gs.have_eyes) else f"(Alias) {pp.name}"
+        surf.blit(render_text(self.font,nm,TEXT),(r.x+8,r.y+6))
+        surf.blit(render_text(self.font_small,f"{pp.city} | {'criminal' if pp.is_criminal() else 'civilian'} | G{pp.guilt}",DIM),(r.x+8,r.y+30))
 
     def _btn_research_cb(self):
         if self.anim_active:
@@ -353,7 +284,7 @@ class Game:
             return
         if not self.selected: self.toast_msg("Select someone first"); return
         if self.gs.phase != "Day": self.toast_msg("Research works best during the day. End Night to research."); return
-        msg=research(self.gs,self.selected)
+        msg=self.act("research",self.selected)
         self.toast_msg(msg); self.refresh_lists()
 
     def _btn_write_cb(self):
@@ -362,6 +293,10 @@ class Game:
             return
         if not self.selected: self.toast_msg("Select someone first"); return
         if self.gs.phase != "Night": self.toast_msg("You can only write in the Death Note at Night. Press End Day to switch."); return
+        if any(p is self.selected for p,_,_ in self.night_queue): self.toast_msg("Already queued tonight — End Day writes the queue"); return
+        slots=MAX_WRITES_PER_DAY-self.gs.entries_today
+        if len(self.night_queue)>=slots:
+            self.toast_msg(f"Queue full ({len(self.night_queue)}/{slots}) — End Day writes it" if self.night_queue else "No writes left tonight — press End Day"); return
         cause_i=0; time_i=0
         def set_cause():
             nonlocal cause_i
@@ -371,12 +306,19 @@ class Game:
             nonlocal time_i
             time_i=(time_i+1)%len(TIMES)
             self.modal.lines=self._compose(self.selected,CAUSES[cause_i],TIMES[time_i])
-        def confirm():
-            self.start_kill_animation(self.selected, CAUSES[cause_i], TIMES[time_i])
-            self.modal.close()
+        def queue():
+            self.night_queue.append((self.selected,CAUSES[cause_i],TIMES[time_i])); self.modal.close()
+            self.toast_msg(f"Queued {len(self.night_queue)}/{MAX_WRITES_PER_DAY-self.gs.entries_today} for tonight")
+        def write_all():
+            queue(); self.play_night()
         def cancel(): self.modal.close()
         self.modal.open("Write in Death Note", self._compose(self.selected,CAUSES[cause_i],TIMES[time_i]),
-                        [("Cause",set_cause),("Time",set_time),("Confirm",confirm),("Cancel",cancel)])
+                        [("Cause",set_cause),("Time",set_time),("Queue",queue),("Write all",write_all),("Cancel",cancel)])
+
+    def play_night(self):
+        """Play the queued writes' animations back to back; they resolve together after the last one."""
+        if not self.night_queue or self.anim_active: return
+        self.anim_queue=list(self.night_queue[1:]); self.start_kill_animation(*self.night_queue[0])
 
     def on_rules(self):
         rules = [
@@ -391,6 +333,23 @@ class Game:
         ]
         self.modal.open("Rules", rules, [("Close", lambda: self.modal.close())])
 
+    NEWS_PAGE = 10
+
+    def on_news(self, start=None, filt=0):
+        filters=[None]+([("name",self.selected.name)] if self.selected else [])+[("city",c) for c in CITIES]
+        filt%=len(filters); kind=filters[filt]
+        if kind is None:
+            total=self.gs.news.total()
+        else:
+            hits=[e for _,e in self.gs.news.search(**{kind[0]:kind[1]})]; total=len(hits)
+        if start is None: start=max(0,total-self.NEWS_PAGE)
+        start=max(0,min(start,max(0,total-self.NEWS_PAGE)))
+        lines=self.gs.news.page(start,self.NEWS_PAGE) if kind is None else hits[start:start+self.NEWS_PAGE]
+        title=f"News {start+1}-{start+len(lines)} of {total}"+(f" — {kind[1]}" if kind else "")
+        self.modal.open(title, lines or ["(nothing yet)"],
+                        [("Older",lambda: self.on_news(start-self.NEWS_PAGE,filt)),("Newer",lambda: self.on_news(start+self.NEWS_PAGE,filt)),
+                         ("Filter",lambda: self.on_news(None,filt+1)),("Close",self.modal.close)])
+
     def _compose(self,p,cause,time_str):
         return [f"Target: {p.name if (not p.has_alias or p.real_name_known or self.gs.have_eyes) else '(Alias) '+p.name}",
                 f"Cause: {cause}", f"Time: {time_str}",
@@ -401,37 +360,28 @@ class Game:
             self.toast_msg("Animation in progress.")
             return
         if self.gs.phase != "Day": self.toast_msg("You can't study at night. End Night first."); return
-        if self.gs.action_points<=0: self.toast_msg("No actions left"); return
-        self.gs.action_points-=1; self.gs.stats["Intelligence"]+=1; self.gs.inv.add_suspicion(-3); self.toast_msg("Studied (+Int)")
+        self.toast_msg(self.act("study"))
 
     def on_family(self):
         if self.anim_active:
             self.toast_msg("Animation in progress.")
             return
         if self.gs.phase != "Day": self.toast_msg("You can't visit family at night."); return
-        if self.gs.action_points<=0: self.toast_msg("No actions left"); return
-        self.gs.action_points-=1; self.gs.stats["Charisma"]+=1; self.gs.inv.add_suspicion(-2); self.toast_msg("Family time (+Cha)")
+        self.toast_msg(self.act("family"))
 
     def on_social(self):
         if self.anim_active:
             self.toast_msg("Animation in progress.")
             return
         if self.gs.phase != "Day": self.toast_msg("Social stuff happens in daytime."); return
-        if self.gs.action_points<=0: self.toast_msg("No actions left"); return
-        self.gs.action_points-=1; self.gs.stats["Courage"]+=1; self.gs.inv.add_suspicion(-2); self.toast_msg("Socialized (+Courage)")
+        self.toast_msg(self.act("social"))
 
     def on_patrol(self):
         if self.anim_active:
             self.toast_msg("Animation in progress.")
             return
         if self.gs.phase != "Day": self.toast_msg("Patrol is a day activity."); return
-        if self.gs.action_points<=0: self.toast_msg("No actions left"); return
-        self.gs.action_points-=1
-        hints=random.sample([p for p in self.gs.city_people if p.alive],k=min(3,len([p for p in self.gs.city_people if p.alive])))
-        for h in hints:
-            if h.is_criminal() and random.random()<0.6:
-                h.notoriety=min(10,h.notoriety+1)
-        self.toast_msg("Patrolled forums. Leads hotter.")
+        self.toast_msg(self.act("patrol"))
 
     def on_eyes(self):
         if self.anim_active:
@@ -440,7 +390,7 @@ class Game:
         if self.gs.have_eyes: self.toast_msg("You already have the Eyes"); return
         if self.gs.phase != "Day": self.toast_msg("The pact is sealed by day, not at midnight."); return
         def accept():
-            self.gs.have_eyes=True; self.gs.intel_points+=1; self.modal.close(); self.toast_msg("Shinigami Eyes accepted — price unknown.")
+            msg=self.act("eyes"); self.modal.close(); self.toast_msg(msg)
         def cancel(): self.modal.close()
         self.modal.open("Shinigami Eyes", ["Trade lifespan for Eyes (stylized).","Intel easier, justice slightly reduced."], [("Accept",accept),("Cancel",cancel)])
 
@@ -449,15 +399,54 @@ class Game:
             self.toast_msg("Animation in progress.")
             return
         if self.gs.phase == "Day":
-            self.gs.phase = "Night"
-            self.gs.entries_today = 0
+            self.act("night")
             self.toast_msg("Night falls — you may write in the Death Note.")
             return
-        end_of_day(self.gs)
-        self.gs.phase = "Day"
+        if self.night_queue:
+            self.play_night(); return
+        self.act("end_of_day")
         self.refresh_lists()
         self.toast_msg(f"Day {self.gs.day}. Intel:{self.gs.intel_points} AP:{self.gs.action_points}")
 
+    def on_advise(self):
+        if self.anim_active:
+            self.toast_msg("Animation in progress.")
+            return
+        if hasattr(self.gs.city_people,"overlay"):
+            self.toast_msg("The advisor needs a fully generated world (start without --lazy).")
+            return
+        if self.advisor is None:
+            self.advisor=Advisor(on_update=lambda: pygame.event.post(pygame.event.Event(ADVISOR_EVENT)))
+        self.advice_for=self.timeline.head; self.advisor.start(self.gs)
+        self.toast_msg("Advisor thinking…")
+
+    def on_advice(self):
+        if self.advice_for!=self.timeline.head: return
+        if self.advisor.error is not None:
+            self.advice_for=None; self.toast_msg(f"Advisor failed: {type(self.advisor.error).__name__}: {self.advisor.error}"); return
+        best=self.advisor.best()
+        if not best: return
+        if not self.advisor.done:
+            m,v,mean=best[0]
+            self.toast_msg(f"Advisor: {describe_move(self.gs,m)} ({mean:+.1f}, {self.advisor.iterations} rollouts)"); return
+        self.advice_for=None
+        people=[m[1] for m,_,_ in best if len(m)>1]
+        def select():
+            self.selected=self.gs.city_people[people[0]]; self.modal.close()
+        self.modal.open(f"Advisor — {self.advisor.iterations} rollouts",
+                        [f"{describe_move(self.gs,m)}  {mean:+.1f} ({v})" for m,v,mean in best],
+                        ([("Select",select)] if people else [])+[("Close",self.modal.close)])
+
+    def on_undo(self):
+        if self.anim_active:
+            self.toast_msg("Animation in progress.")
+            return
+        head=self.timeline.versions[self.timeline.head]
+        if head.parent is None: self.toast_msg("Nothing to undo"); return
+        self.night_queue=[]; self.timeline.undo(); self.save.snapshot(self.gs)
+        self.modal.close(); self.refresh_lists()
+        self.toast_msg(f"Undid {head.label}. Day {self.gs.day} {self.gs.phase}")
+
     def start_kill_animation(self, target: Person, cause: str, time_str: str):
         if self.anim_active:
             return
@@ -490,122 +479,195 @@ class Game:
         elapsed = now - self.anim_data["start"]
         dur = self.anim_data["duration"]
         if elapsed >= dur:
-            t = self.anim_data["target"]
-            msg = resolve_write(self.gs, t, self.anim_data["cause"], self.anim_data["time_str"])
-            self.toast_msg(msg)
-            if self.selected == t:
-                self.selected = None
-            self.refresh_lists()
             self.anim_active = False
             self.anim_data = None
             self.anim_overlay_alpha = 0
+            if self.anim_queue:
+                self.start_kill_animation(*self.anim_queue.pop(0))
+                return
+            entries, self.night_queue = self.night_queue, []
+            msgs = self.act_night(entries)
+            self.toast_msg(msgs[0] if len(msgs) == 1 else f"{msgs.count('Name written.')} of {len(msgs)} names took effect.")
+            if self.selected and not self.selected.alive:
+                self.selected = None
+            self.refresh_lists()
             return
         progress = elapsed / dur
         self.anim_overlay_alpha = int(min(220, 220 * (0.6 + 0.4*progress)))
 
+    ANIM_GLYPHS = {"heart": ("💀", (255,240,240), "They collapse.", (255,220,220)),
+                   "accident": ("💥", (255,240,220), "An accident.", (255,240,220)),
+                   "fade": ("💀", (220,220,220), None, None)}
+
+    def _build_anim_assets(self, typ, size):
+        glyph, gcol, caption, ccol = self.ANIM_GLYPHS[typ]
+        w, h = self.light_flash.get_size()
+        return {"flash": pygame.transform.scale(self.light_flash, (int(w*1.5), int(h*1.5))),
+                "glyph": render_text(self.font_big, glyph, gcol),
+                "caption": render_text(self.font, caption, ccol) if caption else None,
+                "overlay": pygame.Surface(size).convert()}
+
     def draw_kill_animation_overlay(self, surf):
         if not self.anim_active or not self.anim_data:
             return
         typ = self.anim_data["type"]
         elapsed = pygame.time.get_ticks() - self.anim_data["start"]
         dur = self.anim_data["duration"]
-        center = (WIDTH//2, HEIGHT//2)
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        center = (surf.get_width()//2, surf.get_height()//2)
+        assets = self.anim_cache.get(typ, surf.get_size())
 
         def flash_center():
-            big = pygame.transform.scale(
-                self.light_flash,
-                (int(self.light_flash.get_width()*1.5), int(self.light_flash.get_height()*1.5))
-            )
-            surf.blit(big, big.get_rect(center=center))
+            surf.blit(assets["flash"], assets["flash"].get_rect(center=center))
 
+        glyph, caption = assets["glyph"], assets["caption"]
         if typ == "heart":
             pulse = 120 + int(100*math.sin(elapsed/80))
-            overlay.fill((pulse,20,20, min(200, int(180 * (elapsed/dur + 0.2)))))
-            font = self.font_big
-            skull = font.render("💀", True, (255,240,240))
-            surf.blit(skull, skull.get_rect(center=(center[0], center[1]-20)))
-            txt = self.font.render("They collapse.", True, (255,220,220))
-            surf.blit(txt, txt.get_rect(center=(center[0], center[1]+60)))
+            overlay = tint_overlay(assets["overlay"], (pulse,20,20), min(200, int(180 * (elapsed/dur + 0.2))))
+            surf.blit(glyph, glyph.get_rect(center=(center[0], center[1]-20)))
+            surf.blit(caption, caption.get_rect(center=(center[0], center[1]+60)))
             if elapsed < 600:
                 flash_center()
         elif typ == "accident":
             shake = int(6 * math.sin(elapsed/30))
-            overlay.fill((255, 80, 40, min(200, int(200 * (elapsed/dur)))))
-            font = self.font_big
-            crash = font.render("💥", True, (255,240,220))
-            surf.blit(crash, crash.get_rect(center=(center[0]+shake, center[1]-10)))
-            txt = self.font.render("An accident.", True, (255,240,220))
-            surf.blit(txt, txt.get_rect(center=(center[0]+shake, center[1]+60)))
+            overlay = tint_overlay(assets["overlay"], (255,80,40), min(200, int(200 * (elapsed/dur))))
+            surf.blit(glyph, glyph.get_rect(center=(center[0]+shake, center[1]-10)))
+            surf.blit(caption, caption.get_rect(center=(center[0]+shake, center[1]+60)))
             if elapsed < 900:
                 flash_center()
         else:
-            alpha = int(200 * (elapsed/dur))
-            overlay.fill((20,20,30, alpha))
-            skull = self.font_big.render("💀", True, (220,220,220))
-            surf.blit(skull, skull.get_rect(center=(center[0], center[1])))
+            overlay = tint_overlay(assets["overlay"], (20,20,30), int(200 * (elapsed/dur)))
+            surf.blit(glyph, glyph.get_rect(center=(center[0], center[1])))
             if elapsed < 600:
                 flash_center()
         surf.blit(overlay, (0,0))
 
     def draw_top(self):
-        pygame.draw.rect(self.screen,PANEL,(0,0,WIDTH,84)); pygame.draw.line(self.screen,OUT,(0,84),(WIDTH,84),1)
-        self.screen.blit(self.font_big.render(f"Day {self.gs.day} — {self.gs.phase}",True,TEXT),(20,20))
-        self.screen.blit(self.font.render(f"Intel: {self.gs.intel_points}",True,TEXT),(420,20))
-        self.screen.blit(self.font.render(f"AP: {self.gs.action_points}",True,TEXT),(520,20))
-        self.screen.blit(self.font.render(f"Int:{self.gs.stats['Intelligence']} Cha:{self.gs.stats['Charisma']} Crg:{self.gs.stats['Courage']}",True,TEXT),(640,20))
-        self.screen.blit(self.font.render(f"Suspicion: {self.gs.inv.suspicion}",True,BAD),(960,20))
+        self.screen.blit(render_text(self.font_big,f"Day {self.gs.day} — {self.gs.phase}",TEXT),(20,20))
+        self.screen.blit(render_text(self.font,f"Intel: {self.gs.intel_points}",TEXT),(420,20))
+        self.screen.blit(render_text(self.font,f"AP: {self.gs.action_points}",TEXT),(520,20))
+        self.screen.blit(render_text(self.font,f"Int:{self.gs.stats['Intelligence']} Cha:{self.gs.stats['Charisma']} Crg:{self.gs.stats['Courage']}",TEXT),(640,20))
+        self.screen.blit(render_text(self.font,f"Suspicion: {self.gs.inv.suspicion}",BAD),(960,20))
         if self.gs.news:
             preview = self.gs.news[-1]
-            self.screen.blit(self.font.render(preview,True,DIM),(20,86))
+            self.screen.blit(render_text(self.font,preview,DIM),(20,86))
 
-    def draw_columns(self):
-        self.screen.fill(BG)
-        self.draw_top()
-        self.list_news.draw(self.screen,self.font,self.font_small)
-        self.list_people.draw(self.screen,self.font,self.font_small)
-        right=pygame.Rect(20,480,1220,200); pygame.draw.rect(self.screen,PANEL,right,border_radius=12); pygame.draw.rect(self.screen,OUT,right,1,border_radius=12)
+    def draw_inspect(self):
+        right=self.inspect_rect
         if self.selected:
-            self.screen.blit(self.font_big.render(self.selected.name,True,TEXT),(right.x+20,right.y+14))
-            self.screen.blit(self.font.render(f"{self.selected.city} | {'criminal' if self.selected.is_criminal() else 'civilian'} | G{self.selected.guilt} N{self.selected.notoriety}",True,DIM),(right.x+20,right.y+54))
+            self.screen.blit(render_text(self.font_big,self.selected.name,TEXT),(right.x+20,right.y+14))
+            self.screen.blit(render_text(self.font,f"{self.selected.city} | {'criminal' if self.selected.is_criminal() else 'civilian'} | G{self.selected.guilt} N{self.selected.notoriety}",DIM),(right.x+20,right.y+54))
         else:
-            self.screen.blit(self.font.render("Select a person to inspect/write/research.",True,DIM),(right.x+20,right.y+20))
-        for b in (self.btn_research,self.btn_write,self.btn_study,self.btn_family,self.btn_social,self.btn_patrol,self.btn_eyes,self.btn_rules,self.btn_end):
-            b.draw(self.screen,self.font)
-        if self.toast and pygame.time.get_ticks()-self.toast_t<2500:
-            t=self.font.render(self.toast,True,TEXT); box=t.get_rect(); box.inflate_ip(18,12); box.midbottom=(WIDTH//2,HEIGHT-70); pygame.draw.rect(self.screen,PANEL,box,border_radius=10); pygame.draw.rect(self.screen,OUT,box,1,border_radius=10); self.screen.blit(t,t.get_rect(center=box.center))
+            self.screen.blit(render_text(self.font,"Select a person to inspect/write/research.",DIM),(right.x+20,right.y+20))
+        for i,(p,cause,time_str) in enumerate(self.night_queue):
+            self.screen.blit(render_text(self.font_small,f"Tonight {i+1}: {p.name} — {cause} @ {time_str}",WARN),(right.x+20,right.y+90+i*22))
+
+    def draw_toast(self):
+        if self.toast_visible():
+            t=render_text(self.font,self.toast,TEXT); box=t.get_rect(); box.inflate_ip(18,12); box.midbottom=(WIDTH//2,HEIGHT-70); pygame.draw.rect(self.screen,PANEL,box,border_radius=10); pygame.draw.rect(self.screen,OUT,box,1,border_radius=10); self.screen.blit(t,t.get_rect(center=box.center))
+            self.toast_rect=box
+
+    def draw_columns(self):
+        self.screen.blit(self.background,(0,0))
+        for _,draw in self.layers: draw()
+        self.draw_toast()
+
+    def collect_dirty(self):
+        for w in (self.list_news,self.list_people)+self.buttons:
+            if w.dirty: self.dirty.append(w.rect.copy()); w.dirty=False
+        if self.toast_rect and pygame.time.get_ticks()-self.toast_t>=2500:
+            self.dirty.append(self.toast_rect); self.toast_rect=None
+        return self.dirty
+
+    def redraw_dirty(self):
+        for r in self.dirty:
+            self.screen.set_clip(r); self.screen.blit(self.background,r,r)
+            for rect,draw in self.layers:
+                if rect.colliderect(r): draw()
+            if self.toast_rect and self.toast_rect.colliderect(r): self.draw_toast()
+        self.screen.set_clip(None)
+
+    def draw_profile(self):
+        now=pygame.time.get_ticks()
+        if now-self._profile_t>=250:
+            self._profile_t=now; summ=self.profiler.summary(); fr=summ.get("frame")
+            if fr:
+                worst=max((p for p in PROFILE_PHASES if p in summ),key=lambda p: summ[p]["p95_ms"])
+                text=[f"frame p50 {fr['p50_ms']:.2f}  p95 {fr['p95_ms']:.2f}  p99 {fr['p99_ms']:.2f} ms",
+                      f"worst p95: {worst} {summ[worst]['p95_ms']:.2f} ms",f"{self.profiler.frames} frames  max {fr['max_ms']:.1f} ms"]
+            else: text=["profiling…"]
+            self._profile_lines=[self.font_small.render(ln,True,TEXT) for ln in text]  # uncached: changes every refresh
+        pygame.draw.rect(self.screen,PANEL,self.profile_rect); pygame.draw.rect(self.screen,OUT,self.profile_rect,1)
+        for i,t in enumerate(self._profile_lines): self.screen.blit(t,(self.profile_rect.x+8,self.profile_rect.y+6+i*19))
+
+    def render(self, t=0):
+        prof=self.profiler
+        if self.full_redraw or self.modal.visible or self.anim_active:
+            self.draw_columns(); t=prof.add("draw",t)
+            if self.modal.visible: self.modal.draw(self.screen,self.font_big,self.font); t=prof.add("modal",t)
+            if self.anim_active:
+                self.draw_kill_animation_overlay(self.screen); t=prof.add("anim_overlay",t)
+            if self.show_profile: self.draw_profile()
+            pygame.display.flip(); prof.add("flip",t)
+            self.full_redraw=self.anim_active
+            self.collect_dirty(); self.dirty=[]
+            return
+        if self.show_profile: self.dirty.append(self.profile_rect)
+        if self.collect_dirty():
+            self.redraw_dirty(); t=prof.add("draw",t)
+            if self.show_profile: self.draw_profile()
+            pygame.display.update(self.dirty); self.dirty=[]; prof.add("flip",t)
+
+    def toast_visible(self):
+        return bool(self.toast) and pygame.time.get_ticks()-self.toast_t<2500
 
     def loop(self):
         running=True
         while running:
-            dt=self.clock.tick(FPS)
-            for event in pygame.event.get():
+            busy=self.anim_active or self.full_redraw
+            events=self.scheduler.events(busy,self.toast_t+2500 if self.toast_visible() else None)
+            t0=t=self.profiler.mark()
+            for event in events:
                 if event.type==pygame.QUIT: running=False
+                if event.type==pygame.KEYDOWN and event.key==pygame.K_F3:
+                    self.show_profile=not self.show_profile; self.profiler.enabled=True; self.full_redraw=True; continue
                 if event.type==pygame.KEYDOWN and event.key==pygame.K_ESCAPE: running=False
+                if event.type==pygame.KEYDOWN and event.key==pygame.K_z and event.mod&pygame.KMOD_CTRL: self.on_undo(); continue
+                if event.type==pygame.MOUSEBUTTONDOWN: self.full_redraw=True
+                if event.type==ADVISOR_EVENT: self.on_advice(); continue
                 if self.modal.visible:
                     self.modal.handle(event); continue
                 if self.anim_active:
                     continue
                 self.list_news.handle(event); self.list_people.handle(event)
-                for b in (self.btn_research,self.btn_write,self.btn_study,self.btn_family,self.btn_social,self.btn_patrol,self.btn_eyes,self.btn_rules,self.btn_end):
+                for b in self.buttons:
                     b.handle(event)
+            if events: t=self.profiler.add("events",t)
 
             if self.anim_active:
-                self.update_kill_animation()
+                self.update_kill_animation(); t=self.profiler.add("anim_update",t)
 
-            self.draw_columns()
-            if self.modal.visible: self.modal.draw(self.screen,self.font_big,self.font)
-            if self.anim_active:
-                self.draw_kill_animation_overlay(self.screen)
-            if self.gs.inv.game_over():
-                self.modal.open("Game Over", ["L connected the dots.","You are arrested."], [("OK",lambda: self.quit())])
-            pygame.display.flip()
+            if self.gs.inv.game_over() and not self.modal.visible:
+                self.modal.open("Game Over", ["L connected the dots.","You are arrested."], [("Undo",self.on_undo),("OK",lambda: self.quit())])
+            self.render(t); self.profiler.end_frame(t0)
         self.quit()
 
     def quit(self):
         print(f"Final Justice:{int(self.gs.justice)} Suspicion:{self.gs.inv.suspicion}")
+        print(f"Seed: {self.gs.rng.seed}")
+        print("Scheduler:", " ".join(f"{k}={v}" for k,v in self.scheduler.metrics().items()))
+        if self.advisor: self.advisor.close()
+        if self.profiler.frames:
+            fr=self.profiler.summary()["frame"]
+            print(f"Frame ms p50:{fr['p50_ms']:.2f} p95:{fr['p95_ms']:.2f} p99:{fr['p99_ms']:.2f}  trace:",
+                  " ".join(self.profiler.dump(os.path.join("saves","profile"))))
+        self.save.compact(self.gs); self.save.close()
         pygame.quit(); sys.exit()
 
 if __name__=="__main__":
-    random.seed()
-    Game().loop()
\ No newline at end of file
+    ap=argparse.ArgumentParser(description="Death Note: Persona Edition")
+    ap.add_argument("--seed",type=int,help="replay the world and dice of an earlier game")
+    ap.add_argument("--resume",metavar="SAVE",help="continue from a save log, e.g. saves/autosave.dnlog")
+    ap.add_argument("--population",type=int,default=50,help="people in a new world")
+    ap.add_argument("--lazy",action="store_true",help="derive people on demand instead of generating them all up front")
+    args=ap.parse_args()
+    Game(resume=args.resume,seed=args.seed,population=args.population,lazy=args.lazy).loop()
\ No newline at end of file
@@ -0,0 +1,321 @@
+import random
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from investigation import Investigation
+from newsfeed import NewsFeed
+
+DAYS_LIMIT = 40
+START_INTEL = 3
+JUSTICE_WIN = 140
+MAX_SUSPICION = 100
+DAILY_ACTION_POINTS = 3
+MAX_WRITES_PER_DAY = 3
+
+CAUSES = [
+    "heart attack", "accident", "illness", "fall", "stroke",
+    "cardiac arrest", "overdose", "drowning", "unknown"
+]
+TIMES = ["07:00", "12:00", "16:00", "20:00", "23:59", "random"]
+CITIES = ["Tokyo","Osaka","Sapporo","Sendai","Nagoya","Kyoto","Yokohama","Fukuoka"]
+
+@dataclass
+class Person:
+    name: str
+    city: str
+    crime: Optional[str]
+    guilt: int
+    notoriety: int
+    has_alias: bool
+    intel_req: int
+    real_name_known: bool = False
+    alive: bool = True
+
+    def is_criminal(self):
+        return self.crime is not None and self.guilt >= 5
+
+PERSON_FIELDS = ("name","city","crime","guilt","notoriety","has_alias","intel_req","real_name_known","alive")
+
+@dataclass
+class Investigator:
+    suspicion: int = 15
+
+    def add_suspicion(self, amt: int):
+        self.suspicion = max(0, min(MAX_SUSPICION, self.suspicion + amt))
+
+    def game_over(self) -> bool:
+        return self.suspicion >= MAX_SUSPICION
+
+RNG_STREAMS = ("population", "names", "research", "write", "patrol", "policy")
+
+class RngStreams:
+    """Independent, seedable random.Random streams, one per subsystem.
+
+    Stream seeds are derived from (seed, name), so adding draws to one
+    subsystem never shifts another. Without a seed, one is drawn from the
+    global `random` module, so seeding that still reproduces a game.
+    """
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = random.getrandbits(64) if seed is None else seed
+        for name in RNG_STREAMS: self.stream(name)
+
+    def stream(self, name: str) -> random.Random:
+        r = self.__dict__.get(name)
+        if r is None:
+            r = self.__dict__[name] = random.Random(f"{self.seed}:{name}")
+        return r
+
+@dataclass
+class GameState:
+    day: int = 1
+    phase: str = "Day"
+    justice: float = 0.0
+    intel_points: int = START_INTEL
+    entries_today: int = 0
+    action_points: int = DAILY_ACTION_POINTS
+    have_eyes: bool = False
+    city_people: List[Person] = field(default_factory=list)
+    inv: Investigator = field(default_factory=Investigator)
+    news: NewsFeed = field(default_factory=NewsFeed)
+    investigation: Investigation = field(default_factory=Investigation)
+    confidants: dict = field(default_factory=lambda: {"Ryuk":1, "Misa":0})
+    stats: dict = field(default_factory=lambda: {"Intelligence":1, "Charisma":1, "Courage":1})
+    rng: RngStreams = field(default_factory=RngStreams, repr=False, compare=False)
+    watchers: list = field(default_factory=list, repr=False, compare=False)
+
+    def update_person(self, p, **changes):
+        """Mutate a person and tell the watchers (indexes) about it, and a lazy population its overlay."""
+        for k,v in changes.items(): setattr(p, k, v)
+        pop = self.city_people
+        if type(pop) is not list and hasattr(pop, "person_changed"): pop.person_changed(p)
+        for w in self.watchers: w.person_changed(p)
+
+    def add_news(self, s: str):
+        self.news.append(s)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["watchers"] = []
+        return state
+
+SURNAMES = ["Yagami","Amane","Aizawa","Matsuda","Takada","Sato","Suzuki","Tanaka","Watanabe","Takahashi","Ito","Yamada","Nakamura","Kobayashi"]
+GIVEN_NAMES = ["Light","Sachiko","Kenji","Naoki","Haruka","Ryo","Yumi","Shinji","Aya","Takuya","Rei","Kenta","Naomi","Akira"]
+
+def japanese_name_pool(rng=random):
+    pool = [f"{s} {g}" for s in SURNAMES for g in rng.sample(GIVEN_NAMES,k=6)]
+    rng.shuffle(pool)
+    return pool
+
+CRIMES = ["armed robbery","extortion","assault","kidnapping","arson","drug trafficking","embezzlement","murder","cyberfraud"]
+
+_CITY_CODE = {c:i for i,c in enumerate(CITIES)}
+_CRIME_CODE = {c:i for i,c in enumerate(CRIMES)}
+_NAME_CODE = {f"{s} {g}": i*len(GIVEN_NAMES)+j for i,s in enumerate(SURNAMES) for j,g in enumerate(GIVEN_NAMES)}
+
+class CompactPerson:
+    """Slotted Person storing name/city/crime as small-int codes, decoded on access."""
+    __slots__ = ("_name","_city","_crime","guilt","notoriety","has_alias","intel_req","real_name_known","alive")
+
+    def __init__(self, name, city, crime, guilt, notoriety, has_alias, intel_req, real_name_known=False, alive=True):
+        self.name=name; self.city=city; self.crime=crime; self.guilt=guilt; self.notoriety=notoriety
+        self.has_alias=has_alias; self.intel_req=intel_req; self.real_name_known=real_name_known; self.alive=alive
+
+    @property
+    def name(self):
+        c=self._name
+        if c<0: return f"Person{-c-1}"
+        return f"{SURNAMES[c//len(GIVEN_NAMES)]} {GIVEN_NAMES[c%len(GIVEN_NAMES)]}"
+    @name.setter
+    def name(self, v):
+        c=_NAME_CODE.get(v)
+        if c is None:
+            if not v.startswith("Person"): raise ValueError(f"name not in the name table: {v!r}")
+            c=-int(v[6:])-1
+        self._name=c
+
+    @property
+    def city(self): return CITIES[self._city]
+    @city.setter
+    def city(self, v): self._city=_CITY_CODE[v]
+
+    @property
+    def crime(self): return None if self._crime<0 else CRIMES[self._crime]
+    @crime.setter
+    def crime(self, v): self._crime=-1 if v is None else _CRIME_CODE[v]
+
+    def is_criminal(self):
+        return self._crime>=0 and self.guilt>=5
+
+    def __repr__(self):
+        return (f"CompactPerson(name={self.name!r}, city={self.city!r}, crime={self.crime!r}, guilt={self.guilt}, "
+                f"notoriety={self.notoriety}, has_alias={self.has_alias}, intel_req={self.intel_req}, "
+                f"real_name_known={self.real_name_known}, alive={self.alive})")
+
+def gen_population(n=42, compact=False, rng=random, name_rng=None):
+    make = CompactPerson if compact else Person
+    names = japanese_name_pool(name_rng or rng)
+    people=[]
+    for i in range(n):
+        name = names.pop() if names else f"Person{i}"
+        city = rng.choice(CITIES)
+        is_crim = rng.random()<0.55
+        has_alias = rng.random()<0.45
+        guilt = rng.randint(0,10) if is_crim else rng.randint(0,6)
+        notor = rng.randint(0,10)
+        intel = rng.randint(1,3)
+        crime = rng.choice(CRIMES) if is_crim else None
+        people.append(make(name, city, crime, guilt, notor, has_alias, intel))
+    return people
+
+def new_game(seed: Optional[int] = None, population: int = 50, lazy: bool = False, **kw) -> GameState:
+    """A fresh GameState whose population and rules all draw from streams of `seed`.
+
+    With lazy=True people are derived on demand (population_lazy.LazyPopulation).
+    """
+    gs = GameState(rng=RngStreams(seed), **kw)
+    if lazy:
+        from population_lazy import LazyPopulation
+        gs.city_people = LazyPopulation(gs.rng.seed, population)
+    else:
+        gs.city_people = gen_population(population, rng=gs.rng.population, name_rng=gs.rng.names)
+    return gs
+
+def justice_score(p: Person, have_eyes: bool)->float:
+    base = max(0, p.guilt-2)*(1+p.notoriety/20)
+    if have_eyes: base *= 0.85
+    return base
+
+def resolve_write(gs: GameState, p: Person, cause: str, time_str: str):
+    return resolve_night(gs, [(p, cause, time_str)])[0]
+
+def resolve_night(gs: GameState, entries):
+    """Resolve a night's writes [(person, cause, time_str)] in one pass; returns one message per entry.
+
+    Entries are checked in order against the slot limit and the alias rule, with
+    the same outcome as one resolve_write per entry: each death is applied as it
+    resolves, so a repeated person is "Already dead" even when the population
+    hands out a fresh view per index (population_np). Only the suspicion and the
+    watcher notifications are deferred, to once at the end.
+    """
+    msgs=[]; dead=[]; susp=0
+    for p,cause,time_str in entries:
+        if not p.alive:
+            msgs.append("Already dead"); continue
+        if gs.entries_today>=MAX_WRITES_PER_DAY:
+            msgs.append("Notebook resists"); continue
+        gs.entries_today+=1
+        if p.has_alias and not (p.real_name_known or gs.have_eyes):
+            susp+=3
+            gs.add_news("Strange episode, no fatality.")
+            msgs.append("Alias suspected. Suspicion +3"); continue
+        if time_str=="random":
+            time_str = gs.rng.write.choice([t for t in TIMES if t!="random"])
+        p.alive=False; dead.append(p)
+        gs.add_news(f"Death reported in {p.city}: {p.name} — {cause} @ {time_str}")
+        gs.justice += justice_score(p, gs.have_eyes)
+        gs.investigation.record(gs.day, cause, time_str, p.city)
+        if p.guilt<=1:
+            susp+=18
+            gs.add_news("Outrage: possible innocent victim")
+        elif p.guilt<=3:
+            susp+=8
+        susp+=max(0,p.notoriety-4)//2
+        msgs.append("Name written.")
+    for p in dead: gs.update_person(p, alive=False)
+    gs.inv.add_suspicion(susp)  # every term is >= 0, so one clamp equals clamping after each entry
+    return msgs
+
+def research(gs: GameState, p: Person):
+    if gs.intel_points<=0:
+        return "No intel today"
+    cost = 1 if gs.have_eyes else p.intel_req
+    if gs.intel_points < cost:
+        return "Not enough intel"
+    gs.intel_points -= cost
+    if p.has_alias and not p.real_name_known:
+        if gs.rng.research.random() < (1.0 if gs.have_eyes else 0.8):
+            gs.update_person(p, real_name_known=True)
+            gs.add_news(f"Intel: {p.name} confirmed")
+            return "Real name confirmed"
+        return "Trail cold"
+    gs.update_person(p, real_name_known=True)
+    gs.add_news(f"Background check: {p.name}")
+    return "Verified"
+
+def end_of_day(gs: GameState):
+    for amt, msg in gs.investigation.review(gs.day):
+        gs.inv.add_suspicion(amt)
+        gs.add_news(msg)
+
+    base = 4
+    if gs.entries_today == 0:
+        gs.inv.add_suspicion(-5)
+        base = 0
+    elif gs.entries_today >= 2:
+        base += 2
+    gs.inv.add_suspicion(base)
+
+    if gs.action_points > 0:
+        gs.inv.add_suspicion(6)
+
+    gs.day += 1
+    gs.phase = "Day"
+    gs.entries_today = 0
+    gs.intel_points = START_INTEL + (1 if gs.have_eyes else 0)
+    gs.action_points = DAILY_ACTION_POINTS
+
+def begin_night(gs: GameState):
+    gs.phase = "Night"
+    gs.entries_today = 0
+
+def _stat_action(gs: GameState, stat: str, relief: int, msg: str):
+    if gs.action_points<=0:
+        return "No actions left"
+    gs.action_points-=1; gs.stats[stat]+=1; gs.inv.add_suspicion(-relief)
+    return msg
+
+def study(gs: GameState):
+    return _stat_action(gs, "Intelligence", 3, "Studied (+Int)")
+
+def family(gs: GameState):
+    return _stat_action(gs, "Charisma", 2, "Family time (+Cha)")
+
+def social(gs: GameState):
+    return _stat_action(gs, "Courage", 2, "Socialized (+Courage)")
+
+def alive_people(gs: GameState):
+    """Alive people in population order, from an attached index or the population (`alive_people()`) when there is one."""
+    for w in gs.watchers+[gs.city_people]:
+        if hasattr(w, "alive_people"): return w.alive_people()
+    return [p for p in gs.city_people if p.alive]
+
+def patrol(gs: GameState):
+    if gs.action_points<=0:
+        return "No actions left"
+    gs.action_points-=1
+    alive=alive_people(gs)
+    hints=gs.rng.patrol.sample(alive,k=min(3,len(alive)))
+    for h in hints:
+        if h.is_criminal() and gs.rng.patrol.random()<0.6:
+            gs.update_person(h, notoriety=min(10,h.notoriety+1))
+    return "Patrolled forums. Leads hotter."
+
+def take_eyes(gs: GameState):
+    if gs.have_eyes:
+        return "You already have the Eyes"
+    gs.have_eyes=True; gs.intel_points+=1
+    return "Shinigami Eyes accepted — price unknown."
+
+ACTIONS = {
+    "research": research, "write": resolve_write, "night": begin_night, "end_of_day": end_of_day,
+    "study": study, "family": family, "social": social, "patrol": patrol, "eyes": take_eyes,
+}
+
+def apply_action(gs: GameState, name: str, person: Optional[int] = None, cause: Optional[str] = None, time_str: Optional[str] = None):
+    """Run a rule by name; `person` is an index into gs.city_people."""
+    fn = ACTIONS[name]
+    if name == "research":
+        return fn(gs, gs.city_people[person])
+    if name == "write":
+        return fn(gs, gs.city_people[person], cause, time_str)
+    return fn(gs)
@@ -0,0 +1,223 @@
+"""Indexes over GameState.city_people kept current through GameState.update_person."""
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Sequence
+from itertools import accumulate, chain
+
+
+class ChunkedSortedList:
+    """A sorted list stored as chunks of at most 2*`load` items plus each chunk's maximum.
+
+    add/remove bisect the maxima, then insert into or delete from one chunk, so
+    an update moves at most 2*`load` items however long the list is (a flat
+    list moves half of it on average). Chunks split when they grow past
+    2*`load` and are dropped when they empty.
+    """
+
+    def __init__(self, items=(), load=512):
+        items = sorted(items); self.load = load
+        self.chunks = [items[i:i+load] for i in range(0, len(items), load)]
+        self.maxes = [c[-1] for c in self.chunks]
+        self.n = len(items)
+
+    def add(self, v):
+        if not self.chunks:
+            self.chunks.append([v]); self.maxes.append(v)
+        else:
+            k = min(bisect_left(self.maxes, v), len(self.chunks)-1)
+            c = self.chunks[k]; insort(c, v); self.maxes[k] = c[-1]
+            if len(c) > 2*self.load:
+                self.chunks[k:k+1] = [c[:self.load], c[self.load:]]
+                self.maxes[k:k+1] = [c[self.load-1], c[-1]]
+        self.n += 1
+
+    def remove(self, v):
+        k = bisect_left(self.maxes, v)
+        c = self.chunks[k]; del c[bisect_left(c, v)]
+        if c: self.maxes[k] = c[-1]
+        else: del self.chunks[k]; del self.maxes[k]
+        self.n -= 1
+
+    def head(self, k):
+        """The `k` smallest items."""
+        out = []
+        for c in self.chunks:
+            if len(out) >= k: break
+            out += c[:k-len(out)]
+        return out
+
+    def __iter__(self):
+        return chain.from_iterable(self.chunks)
+
+    def __len__(self):
+        return self.n
+
+
+class RankedIndex:
+    """Alive people ordered like the target shortlist: criminals first, then by notoriety.
+
+    Keys are (not criminal, -notoriety, position) tuples in a ChunkedSortedList,
+    so a change is a binary search plus one bounded insert/delete and ties
+    keep population order, exactly like the stable sort it replaces.
+    """
+
+    def __init__(self, people):
+        self.people = people
+        self.pos = {id(p): i for i, p in enumerate(people)}
+        self.keys = [self.key(i, p) for i, p in enumerate(people)]
+        self.order = ChunkedSortedList(k for k in self.keys if k is not None)
+
+    @staticmethod
+    def key(i, p):
+        return (not p.is_criminal(), -p.notoriety, i) if p.alive else None
+
+    def person_changed(self, p):
+        i = self.pos.get(id(p))
+        if i is None:
+            return
+        old, new = self.keys[i], self.key(i, p)
+        if old == new:
+            return
+        if old is not None:
+            self.order.remove(old)
+        if new is not None:
+            self.order.add(new)
+        self.keys[i] = new
+
+    def top(self, k):
+        return [self.people[key[2]] for key in self.order.head(k)]
+
+    def __len__(self):
+        return len(self.order)
+
+
+def alias_status(p):
+    """'unknown' for an alias whose real name is not confirmed, else 'known' or 'plain' (no alias)."""
+    if p.real_name_known: return "known"
+    return "unknown" if p.has_alias else "plain"
+
+
+NOTORIETY_BUCKETS = ((0, 3), (4, 6), (7, 10))
+
+
+def notoriety_bucket(p):
+    return 0 if p.notoriety <= 3 else 1 if p.notoriety <= 6 else 2
+
+
+class BucketIndex:
+    """Positions grouped by key(person); each bucket stays sorted, i.e. in population order.
+
+    A move between buckets is a bisect plus one insert/delete. People whose key
+    is None are left out.
+    """
+
+    def __init__(self, people, key):
+        self.key = key
+        self.keys = [key(p) for p in people]
+        self.buckets = {}
+        for i, k in enumerate(self.keys):
+            if k is not None: self.buckets.setdefault(k, []).append(i)
+
+    def update(self, i, p):
+        old, new = self.keys[i], self.key(p)
+        if old == new:
+            return
+        if old is not None:
+            b = self.buckets[old]; del b[bisect_left(b, i)]
+        if new is not None:
+            insort(self.buckets.setdefault(new, []), i)
+        self.keys[i] = new
+
+    def get(self, k):
+        """The bucket's positions; shared with the index, so do not modify it."""
+        return self.buckets.get(k, ())
+
+    def count(self, k):
+        return len(self.buckets.get(k, ()))
+
+
+class PositionView(Sequence):
+    """people[positions[i]] as a read-only sequence (no copy), e.g. for ScrollList or random.sample."""
+    __slots__ = ("people", "positions")
+
+    def __init__(self, people, positions):
+        self.people = people; self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.people[j] for j in self.positions[i]]
+        return self.people[self.positions[i]]
+
+
+class ChainView(Sequence):
+    """Several position buckets read back to back without copying them.
+
+    Lookups bisect the running bucket lengths; the view reflects the buckets as
+    they were when it was made, so rebuild it after the people change.
+    """
+    __slots__ = ("people", "buckets", "ends")
+
+    def __init__(self, people, buckets):
+        self.people = people; self.buckets = buckets; self.ends = list(accumulate(map(len, buckets)))
+
+    def __len__(self):
+        return self.ends[-1] if self.ends else 0
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0: i += len(self)
+        if not 0 <= i < len(self): raise IndexError(i)
+        b = bisect_right(self.ends, i)
+        return self.people[self.buckets[b][i-(self.ends[b-1] if b else 0)]]
+
+
+class SecondaryIndexes:
+    """Bucket indexes by city, crime, alive, alias status and notoriety band, plus the
+    (city, criminal, alias status) combination of alive people that the people filter uses.
+    """
+
+    def __init__(self, people):
+        self.people = people
+        self.pos = {id(p): i for i, p in enumerate(people)}
+        self.by = {
+            "city": BucketIndex(people, lambda p: p.city),
+            "crime": BucketIndex(people, lambda p: p.crime),
+            "alive": BucketIndex(people, lambda p: p.alive),
+            "alias": BucketIndex(people, alias_status),
+            "notoriety": BucketIndex(people, notoriety_bucket),
+            "filter": BucketIndex(people, lambda p: (p.city, p.is_criminal(), alias_status(p)) if p.alive else None),
+        }
+
+    def person_changed(self, p):
+        i = self.pos.get(id(p))
+        if i is None:
+            return
+        for index in self.by.values():
+            index.update(i, p)
+
+    def alive_people(self):
+        return PositionView(self.people, self.by["alive"].get(True))
+
+    def select(self, city=None, criminal=None, alias=None):
+        """Alive people matching every given criterion.
+
+        No criterion or all three is one bucket, in population order; otherwise
+        the matching buckets are chained in key order. Nothing is copied.
+        """
+        if city is None and criminal is None and alias is None:
+            return self.alive_people()
+        combo = self.by["filter"]
+        if city is not None and criminal is not None and alias is not None:
+            return PositionView(self.people, combo.get((city, criminal, alias)))
+        keys = sorted(self._matching(city, criminal, alias), key=lambda k: (k[0], not k[1], k[2]))
+        return ChainView(self.people, [combo.buckets[k] for k in keys])
+
+    def count(self, city=None, criminal=None, alias=None):
+        return sum(self.by["filter"].count(k) for k in self._matching(city, criminal, alias))
+
+    def _matching(self, city, criminal, alias):
+        return [k for k in self.by["filter"].buckets
+                if (city is None or k[0] == city) and (criminal is None or k[1] == criminal) and (alias is None or k[2] == alias)]
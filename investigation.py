@@ -0,0 +1,122 @@
+"""Investigation model: pattern detectors over sliding windows of the death log.
+
+Each detector watches one field of a death (cause, time or city) through a
+window bounded by entry count, by days, or unbounded (whole game) and keeps
+counts plus the current maximum with O(1) work per death. Ties name the key
+seen first in the window, as `max(counts, key=counts.get)` over the deaths in
+order did.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+
+FIELDS = ("cause", "time", "city")
+
+
+class SlidingCounter:
+    """Key counts over a window with O(1) add/evict and most-common (a window scan on ties)."""
+
+    def __init__(self, entries=None, days=None):
+        self.entries = entries; self.days = days
+        self.log = deque(); self.counts = {}; self.buckets = {}; self.top = 0
+
+    def add(self, day, key):
+        self._inc(key)
+        if self.entries is None and self.days is None:
+            return
+        self.log.append((day, key))
+        if self.entries is not None and len(self.log) > self.entries:
+            self._dec(self.log.popleft()[1])
+
+    def advance(self, day):
+        """Drop deaths older than the day window as of `day`."""
+        if self.days is None:
+            return
+        while self.log and self.log[0][0] <= day-self.days:
+            self._dec(self.log.popleft()[1])
+
+    def most_common(self):
+        if not self.top:
+            return None, 0
+        tied = self.buckets[self.top]
+        if len(tied) > 1:
+            # first in window order; an unbounded window keeps no log, but its counts are in first-seen order
+            order = self.counts if self.entries is None and self.days is None else (k for _, k in self.log)
+            return next(k for k in order if k in tied), self.top
+        return next(iter(tied)), self.top
+
+    def _inc(self, key):
+        c = self.counts.get(key, 0)
+        if c: self._unbucket(key, c)
+        self.counts[key] = c+1
+        self.buckets.setdefault(c+1, {})[key] = None
+        if c+1 > self.top: self.top = c+1
+
+    def _dec(self, key):
+        c = self.counts[key]
+        self._unbucket(key, c)
+        if c == 1:
+            del self.counts[key]
+        else:
+            self.counts[key] = c-1
+            self.buckets.setdefault(c-1, {})[key] = None
+        if self.top == c and c not in self.buckets: self.top = c-1
+
+    def _unbucket(self, key, c):
+        bucket = self.buckets[c]
+        del bucket[key]
+        if not bucket: del self.buckets[c]
+
+
+@dataclass
+class PatternDetector:
+    field: str
+    threshold: int
+    suspicion: int
+    message: str
+    entries: int = None
+    days: int = None
+    counter: SlidingCounter = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.counter = SlidingCounter(self.entries, self.days)
+
+    def check(self, day):
+        self.counter.advance(day)
+        key, n = self.counter.most_common()
+        if n >= self.threshold:
+            return self.suspicion, self.message.format(key=key, n=n)
+        return None
+
+
+def legacy_detectors():
+    """The original rules: 3 matching causes, times or cities among the last 7 deaths."""
+    return [PatternDetector("cause", 3, 3, "Investigators note cause pattern: {key}", entries=7),
+            PatternDetector("time", 3, 3, "Investigators note time pattern: {key}", entries=7),
+            PatternDetector("city", 3, 3, "Cluster of deaths in {key}", entries=7)]
+
+
+def multi_window_detectors():
+    """Legacy rules plus same-day, weekly and whole-game windows."""
+    return legacy_detectors()+[
+        PatternDetector("city", 3, 2, "Same-night deaths in {key}", days=1),
+        PatternDetector("cause", 8, 4, "Weekly {key} deaths draw attention", days=7),
+        PatternDetector("city", 12, 5, "Task force assigned to {key}", days=7),
+        PatternDetector("time", 25, 6, "Deaths at {key} are now a known signature"),
+    ]
+
+
+class Investigation:
+    def __init__(self, detectors=None):
+        self.detectors = legacy_detectors() if detectors is None else detectors
+        self._slots = [FIELDS.index(d.field) for d in self.detectors]
+        self.deaths = 0
+
+    def record(self, day, cause, time_str, city):
+        death = (cause, time_str, city)
+        for d, slot in zip(self.detectors, self._slots):
+            d.counter.add(day, death[slot])
+        self.deaths += 1
+
+    def review(self, day):
+        """(suspicion, news) for every detector whose pattern shows at the end of `day`."""
+        return [hit for hit in (d.check(day) for d in self.detectors) if hit]
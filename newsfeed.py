@@ -0,0 +1,159 @@
+"""News feed: fixed-capacity in-memory ring with an optional append-only archive on disk."""
+import os
+import struct
+
+_OFF = struct.Struct("<Q")
+
+
+class NewsArchive:
+    """Append-only text log (one entry per line) plus an 8-byte offset per entry in `<path>.idx`.
+
+    With keep_open=False the files are closed after every append, for hosts that
+    keep many archives live at once (server sessions).
+    """
+
+    def __init__(self, path, fresh=False, keep_open=True):
+        self.path = path; self.idx_path = path+".idx"; self.keep_open = keep_open
+        self._data = self._idx = None
+        if fresh:
+            for p in (self.path, self.idx_path):
+                if os.path.exists(p): os.remove(p)
+        self.count = os.path.getsize(self.idx_path)//_OFF.size if os.path.exists(self.idx_path) else 0
+
+    def _open(self):
+        if self._data is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._data = open(self.path, "a+b"); self._idx = open(self.idx_path, "a+b")
+        return self._data, self._idx
+
+    def append(self, text):
+        data, idx = self._open()
+        data.seek(0, os.SEEK_END)
+        idx.write(_OFF.pack(data.tell()))
+        data.write(text.replace("\n", " ").encode("utf-8")+b"\n")
+        self.count += 1
+        if not self.keep_open: self.close()
+
+    def flush(self):
+        if self._data: self._data.flush(); self._idx.flush()
+
+    def __len__(self):
+        return self.count
+
+    def page(self, start, count):
+        """Entries [start, start+count) read through the offset index."""
+        stop = min(self.count, start+count)
+        if start >= stop: return []
+        data, idx = self._open(); self.flush()
+        idx.seek(start*_OFF.size)
+        offs = [o for (o,) in _OFF.iter_unpack(idx.read((stop-start)*_OFF.size))]
+        end = self._end(stop, idx, data)
+        data.seek(offs[0])
+        return [ln.decode("utf-8") for ln in data.read(end-offs[0]).splitlines()]
+
+    def _end(self, stop, idx, data):
+        if stop < self.count:
+            idx.seek(stop*_OFF.size)
+            return _OFF.unpack(idx.read(_OFF.size))[0]
+        return data.seek(0, os.SEEK_END)
+
+    def __iter__(self):
+        if not self.count: return
+        data, _ = self._open(); self.flush()
+        data.seek(0)
+        for ln in data:
+            yield ln.decode("utf-8").rstrip("\n")
+
+    def truncate(self):
+        """Drop entries past `count` (written after the snapshot this archive was restored from)."""
+        if not os.path.exists(self.idx_path) or os.path.getsize(self.idx_path) <= self.count*_OFF.size:
+            return
+        self.close()
+        with open(self.idx_path, "r+b") as idx:
+            idx.seek(self.count*_OFF.size)
+            end = _OFF.unpack(idx.read(_OFF.size))[0]
+            idx.truncate(self.count*_OFF.size)
+        with open(self.path, "r+b") as data:
+            data.truncate(end)
+
+    def __getstate__(self):
+        self.flush()
+        return {"path": self.path, "idx_path": self.idx_path, "count": self.count, "keep_open": self.keep_open}
+
+    def __setstate__(self, state):
+        self.keep_open = True
+        self.__dict__.update(state); self._data = self._idx = None
+
+    def remove(self):
+        """Close and delete both files."""
+        self.close()
+        for p in (self.path, self.idx_path):
+            if os.path.exists(p): os.remove(p)
+
+    def close(self):
+        if self._data: self._data.close(); self._idx.close()
+        self._data = self._idx = None
+
+
+class NewsFeed:
+    """Latest `capacity` headlines in a ring; evicted ones go to `archive` if set.
+
+    Indexing and iteration cover the in-memory window (news[-1] is the newest);
+    page() and search() cover the whole game, archive first.
+    """
+
+    def __init__(self, capacity=50, archive=None):
+        self.capacity = capacity; self.archive = archive
+        self._buf = [None]*capacity; self._head = 0; self._len = 0
+
+    def append(self, s):
+        if self._len < self.capacity:
+            self._buf[(self._head+self._len) % self.capacity] = s; self._len += 1
+            return
+        if self.archive is not None:
+            self.archive.append(self._buf[self._head])
+        self._buf[self._head] = s
+        self._head = (self._head+1) % self.capacity
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._len))]
+        if i < 0: i += self._len
+        if not 0 <= i < self._len: raise IndexError(i)
+        return self._buf[(self._head+i) % self.capacity]
+
+    def __iter__(self):
+        return (self._buf[(self._head+i) % self.capacity] for i in range(self._len))
+
+    def restore(self, entries, archived=None):
+        """Reset the ring to `entries` (oldest first) and the archive to its first `archived` entries."""
+        entries = list(entries[-self.capacity:])
+        self._buf = entries+[None]*(self.capacity-len(entries)); self._head = 0; self._len = len(entries)
+        if archived is not None and self.archive is not None and archived < len(self.archive):
+            self.archive.flush(); self.archive.count = archived; self.archive.truncate()
+
+    def total(self):
+        return (len(self.archive) if self.archive is not None else 0)+self._len
+
+    def page(self, start, count):
+        """Entries [start, start+count) over the whole game (0 is the oldest kept)."""
+        archived = len(self.archive) if self.archive is not None else 0
+        out = self.archive.page(start, count) if start < archived else []
+        lo = max(0, start-archived)
+        return out+self[lo:lo+count-len(out)]
+
+    def search(self, city=None, name=None):
+        """(position, entry) for every entry mentioning `city` and `name`, streamed from disk."""
+        terms = [t for t in (city, name) if t]
+        entries = self.archive if self.archive is not None else ()
+        for pos, entry in enumerate(_chain(entries, self)):
+            if all(t in entry for t in terms):
+                yield pos, entry
+
+
+def _chain(*its):
+    for it in its:
+        yield from it
@@ -0,0 +1,172 @@
+"""Lazy population: people derived from (seed, index) and created only when touched.
+
+`LazyPopulation` is a drop-in sequence for `GameState.city_people` of any size.
+Indexing it builds a plain `engine.Person` from a hash of (seed, index) and
+hands back the same object for as long as anything holds it. People changed
+through GameState.update_person move into `overlay` and stay there, so
+resident memory follows what the game has looked at or touched, not the
+population size. Nothing is generated up front.
+
+The population also answers the queries the window otherwise gets from
+`indexes.RankedIndex` and `indexes.SecondaryIndexes` (`top`, `alive_people`,
+`select`, `pos`), by scanning in index order and stopping as soon as the
+answer is settled. A lazy world is not the eager world of the same seed; only
+the names (the same name stream) agree.
+
+    python "death note main.py" --lazy --population 10000000
+"""
+import random
+import weakref
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Sequence
+
+from engine import CITIES, CRIMES, Person, japanese_name_pool
+from indexes import alias_status
+
+_MASK = (1 << 64)-1
+SELECT_LIMIT = 100  # rows returned by select(); a full count would scan the whole world
+_BEST = (False, -10)  # RankedIndex key prefix nobody can beat: criminal, notoriety 10
+
+
+def _mix(x):
+    # splitmix64 finalizer
+    x = (x+0x9E3779B97F4A7C15) & _MASK
+    x = ((x ^ (x >> 30))*0xBF58476D1CE4E5B9) & _MASK
+    x = ((x ^ (x >> 27))*0x94D049BB133111EB) & _MASK
+    return x ^ (x >> 31)
+
+
+class LazyPopulation(Sequence):
+    def __init__(self, seed, n):
+        self.seed = seed; self.n = n
+        self._base = random.Random(f"{seed}:lazy").getrandbits(64)
+        self._names = None
+        self._refs = {}    # index -> weakref to the live Person
+        self.pos = {}      # id(person) -> index, for every live Person
+        self.overlay = {}  # index -> Person changed since it was derived; held strongly
+        self._dead = []    # sorted indices of dead people (all in the overlay)
+
+    def record(self, i):
+        """The derived (unchanged) fields of person `i`, as Person's positional arguments."""
+        a = _mix(self._base+i); b = _mix(a)
+        is_crim = (a & 0xFFFF) < 36045  # 0.55
+        has_alias = (a >> 16 & 0xFFFF) < 29491  # 0.45
+        guilt = (a >> 32 & 0xFFFF) % (11 if is_crim else 7)
+        crime = CRIMES[(a >> 48) % len(CRIMES)] if is_crim else None
+        if self._names is None: self._names = japanese_name_pool(random.Random(f"{self.seed}:names"))
+        name = self._names[-1-i] if i < len(self._names) else f"Person{i}"
+        return (name, CITIES[(b & 0xFFFF) % len(CITIES)], crime, guilt,
+                (b >> 16 & 0xFFFF) % 11, has_alias, 1+(b >> 32 & 0xFFFF) % 3)
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.n))]
+        if i < 0: i += self.n
+        if not 0 <= i < self.n: raise IndexError(i)
+        ref = self._refs.get(i)
+        p = ref() if ref is not None else None
+        if p is None:
+            p = self._adopt(i, Person(*self.record(i)))
+        return p
+
+    def _adopt(self, i, p):
+        key = id(p)
+        self._refs[i] = weakref.ref(p, lambda _, i=i, key=key: self._forget(i, key))
+        self.pos[key] = i
+        return p
+
+    def _forget(self, i, key):
+        self.pos.pop(key, None)
+        ref = self._refs.get(i)
+        if ref is not None and ref() is None: del self._refs[i]
+
+    def peek(self, i):
+        """Person `i` for reading: the live one if there is one, else a throwaway derived copy."""
+        p = self.overlay.get(i)
+        if p is None:
+            ref = self._refs.get(i)
+            p = (ref() if ref is not None else None) or Person(*self.record(i))
+        return p
+
+    def resident(self):
+        """How many people currently exist as objects."""
+        return len(self._refs)
+
+    def person_changed(self, p):
+        i = self.pos.get(id(p))
+        if i is None:
+            return
+        self.overlay[i] = p
+        k = bisect_left(self._dead, i)
+        dead = k < len(self._dead) and self._dead[k] == i
+        if not p.alive and not dead: self._dead.insert(k, i)
+        elif p.alive and dead: del self._dead[k]
+
+    # RankedIndex / SecondaryIndexes queries
+
+    @staticmethod
+    def key(i, p):
+        return (not p.is_criminal(), -p.notoriety, i) if p.alive else None
+
+    def top(self, k):
+        """RankedIndex.top without an index: stops after k unbeatable people, else scans everyone."""
+        found = []; best = 0  # the k smallest keys so far, sorted
+        for i in range(self.n):
+            key = self.key(i, self.peek(i))
+            if key is None: continue
+            if len(found) < k: insort(found, key)
+            elif key < found[-1]: found.pop(); insort(found, key)
+            if key[:2] == _BEST:
+                best += 1
+                if best >= k: break
+        return [self[key[2]] for key in found]
+
+    def alive_people(self):
+        return AliveView(self)
+
+    def select(self, city=None, criminal=None, alias=None, limit=SELECT_LIMIT):
+        """The first `limit` alive people matching every given criterion, in population order."""
+        # real names are only ever confirmed by a rule, so "known" people are all in the overlay
+        candidates = sorted(self.overlay) if alias == "known" else range(self.n)
+        out = []
+        for i in candidates:
+            p = self.peek(i)
+            if p.alive and (city is None or p.city == city) and (criminal is None or p.is_criminal() == criminal) \
+                    and (alias is None or alias_status(p) == alias):
+                out.append(self[i])
+                if len(out) >= limit: break
+        return out
+
+    def __getstate__(self):
+        return {"seed": self.seed, "n": self.n, "overlay": self.overlay}
+
+    def __setstate__(self, state):
+        self.__init__(state["seed"], state["n"])
+        for i, p in state["overlay"].items():
+            self._adopt(i, p); self.person_changed(p)
+
+
+class AliveView(Sequence):
+    """Alive people of a LazyPopulation in population order; live, and nobody is materialized until read."""
+    __slots__ = ("pop",)
+
+    def __init__(self, pop):
+        self.pop = pop
+
+    def __len__(self):
+        return self.pop.n-len(self.pop._dead)
+
+    def __getitem__(self, j):
+        if isinstance(j, slice):
+            return [self[x] for x in range(*j.indices(len(self)))]
+        if j < 0: j += len(self)
+        if not 0 <= j < len(self): raise IndexError(j)
+        # the j-th alive index is the smallest i with i == j + (dead people at or before i)
+        dead = self.pop._dead; i = j
+        while True:
+            nxt = j+bisect_right(dead, i)
+            if nxt == i: return self.pop[i]
+            i = nxt
@@ -0,0 +1,137 @@
+"""Struct-of-arrays population backed by NumPy columns.
+
+`Population` is a drop-in sequence for `GameState.city_people`: indexing or
+iterating yields `PersonView` objects that read and write the columns, so the
+rule functions and the GUI keep working, while bulk queries stay vectorized.
+NumPy is optional; importing this module without it raises ImportError.
+"""
+from engine import CITIES, CRIMES, SURNAMES, GIVEN_NAMES, Person
+
+try:
+    import numpy as np
+except ImportError as e:  # pragma: no cover
+    raise ImportError("population_np needs numpy (pip install numpy)") from e
+
+NAMES = [f"{s} {g}" for s in SURNAMES for g in GIVEN_NAMES]
+
+COLUMNS = {
+    "name_idx": np.int32, "city": np.int8, "crime": np.int8, "guilt": np.int8,
+    "notoriety": np.int8, "has_alias": np.bool_, "intel_req": np.int8,
+    "real_name_known": np.bool_, "alive": np.bool_,
+}
+
+
+class PersonView:
+    __slots__ = ("pop", "idx")
+
+    def __init__(self, pop, idx):
+        self.pop = pop; self.idx = idx
+
+    @property
+    def name(self):
+        return self.pop.names[self.pop.name_idx[self.idx]]
+
+    @property
+    def city(self):
+        return CITIES[self.pop.city[self.idx]]
+
+    @property
+    def crime(self):
+        c = self.pop.crime[self.idx]
+        return CRIMES[c] if c >= 0 else None
+
+    def is_criminal(self):
+        return self.pop.crime[self.idx] >= 0 and self.pop.guilt[self.idx] >= 5
+
+    def to_person(self):
+        return Person(self.name, self.city, self.crime, self.guilt, self.notoriety, self.has_alias,
+                      self.intel_req, self.real_name_known, self.alive)
+
+    def __eq__(self, other):
+        return isinstance(other, PersonView) and other.pop is self.pop and other.idx == self.idx
+
+    def __hash__(self):
+        return hash((id(self.pop), self.idx))
+
+    def __repr__(self):
+        return f"PersonView({self.idx}, {self.name!r}, {self.city!r}, crime={self.crime!r}, alive={self.alive})"
+
+
+def _column(col, cast):
+    def get(self): return cast(getattr(self.pop, col)[self.idx])
+    def set(self, v): getattr(self.pop, col)[self.idx] = v
+    return property(get, set)
+
+for _col in ("guilt", "notoriety", "intel_req"):
+    setattr(PersonView, _col, _column(_col, int))
+for _col in ("has_alias", "real_name_known", "alive"):
+    setattr(PersonView, _col, _column(_col, bool))
+
+
+class Population:
+    def __init__(self, names=NAMES, **columns):
+        self.names = names
+        for col, dtype in COLUMNS.items():
+            setattr(self, col, np.ascontiguousarray(columns[col], dtype=dtype))
+        self.n = len(self.alive)
+
+    @classmethod
+    def generate(cls, n, seed=None):
+        """Vectorized equivalent of `engine.gen_population` (names may repeat)."""
+        rng = np.random.default_rng(seed)
+        is_crim = rng.random(n) < 0.55
+        return cls(
+            name_idx=rng.integers(0, len(NAMES), n),
+            city=rng.integers(0, len(CITIES), n),
+            crime=np.where(is_crim, rng.integers(0, len(CRIMES), n), -1),
+            guilt=np.where(is_crim, rng.integers(0, 11, n), rng.integers(0, 7, n)),
+            notoriety=rng.integers(0, 11, n),
+            has_alias=rng.random(n) < 0.45,
+            intel_req=rng.integers(1, 4, n),
+            real_name_known=np.zeros(n, np.bool_),
+            alive=np.ones(n, np.bool_),
+        )
+
+    @classmethod
+    def from_people(cls, people):
+        names = {}
+        cols = {col: [] for col in COLUMNS}
+        for p in people:
+            cols["name_idx"].append(names.setdefault(p.name, len(names))); cols["city"].append(CITIES.index(p.city))
+            cols["crime"].append(CRIMES.index(p.crime) if p.crime else -1)
+            for col in ("guilt", "notoriety", "has_alias", "intel_req", "real_name_known", "alive"):
+                cols[col].append(getattr(p, col))
+        return cls(list(names), **cols)
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [PersonView(self, j) for j in range(*i.indices(self.n))]
+        if i < 0: i += self.n
+        if not 0 <= i < self.n: raise IndexError(i)
+        return PersonView(self, i)
+
+    def __iter__(self):
+        return (PersonView(self, i) for i in range(self.n))
+
+    def criminal_mask(self):
+        return (self.crime >= 0) & (self.guilt >= 5)
+
+    def alive_indices(self):
+        return np.flatnonzero(self.alive)
+
+    def criminal_indices(self, alive_only=True):
+        mask = self.criminal_mask()
+        return np.flatnonzero(mask & self.alive if alive_only else mask)
+
+    def justice_scores(self, have_eyes=False):
+        base = np.maximum(0, self.guilt.astype(np.float64)-2) * (1+self.notoriety/20)
+        return base*0.85 if have_eyes else base
+
+    def views(self, indices):
+        return [PersonView(self, int(i)) for i in indices]
+
+    def nbytes(self):
+        return sum(getattr(self, col).nbytes for col in COLUMNS)
@@ -0,0 +1,85 @@
+"""Frame-phase profiler with fixed-size log-bucket histograms.
+
+Each phase keeps a histogram of `BUCKETS` counters spaced a quarter octave
+apart (≈19% resolution from 1 µs up to ~4 s), so memory and the cost of
+recording stay constant however long a session runs. A ring of the last
+`trace_frames` frames is kept for the CSV trace. When disabled, `mark()`
+returns 0 and `add()` returns at once.
+
+    DN_PROFILE=1 python "death note main.py"     # F3 toggles the overlay
+"""
+import csv
+import json
+import math
+import os
+import time
+from collections import deque
+
+STEPS_PER_OCTAVE = 4
+BUCKETS = 128  # 2**(128/4) ns ≈ 4.3 s
+
+
+class Histogram:
+    __slots__ = ("counts", "n", "total", "max")
+
+    def __init__(self):
+        self.counts = [0]*BUCKETS; self.n = 0; self.total = 0; self.max = 0
+
+    def add(self, ns):
+        b = int(math.log2(ns)*STEPS_PER_OCTAVE) if ns > 1 else 0
+        self.counts[b if b < BUCKETS else BUCKETS-1] += 1
+        self.n += 1; self.total += ns
+        if ns > self.max: self.max = ns
+
+    def quantile(self, q):
+        """Upper edge of the bucket holding the q-quantile, in ms."""
+        if not self.n: return 0.0
+        rank = q*self.n; seen = 0
+        for b, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(2**((b+1)/STEPS_PER_OCTAVE), self.max)/1e6
+        return self.max/1e6
+
+    def summary(self):
+        return {"n": self.n, "mean_ms": round(self.total/self.n/1e6, 4) if self.n else 0.0,
+                "p50_ms": round(self.quantile(0.5), 4), "p95_ms": round(self.quantile(0.95), 4),
+                "p99_ms": round(self.quantile(0.99), 4), "max_ms": round(self.max/1e6, 4)}
+
+
+class Profiler:
+    def __init__(self, phases, enabled=False, trace_frames=3600):
+        self.phases = tuple(phases); self.enabled = enabled
+        self.hist = {p: Histogram() for p in self.phases+("frame",)}
+        self.trace = deque(maxlen=trace_frames); self._row = {}; self.frames = 0
+
+    def mark(self):
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def add(self, phase, t0):
+        """Charge the time since `t0` (from mark()) to `phase`; returns a new mark."""
+        if not t0: return 0
+        now = time.perf_counter_ns(); ns = now-t0
+        self.hist[phase].add(ns); self._row[phase] = self._row.get(phase, 0)+ns
+        return now
+
+    def end_frame(self, t0):
+        """Close a frame started at `t0`; frames that did no work are not counted."""
+        if not t0 or not self._row: self._row = {}; return
+        self.hist["frame"].add(time.perf_counter_ns()-t0)
+        self.trace.append((self.frames, self._row)); self._row = {}; self.frames += 1
+
+    def summary(self):
+        return {p: h.summary() for p, h in self.hist.items() if h.n}
+
+    def dump(self, prefix):
+        """Write `prefix`.json (percentiles and raw buckets) and `prefix`.csv (recent frames, µs)."""
+        os.makedirs(os.path.dirname(prefix) or ".", exist_ok=True)
+        with open(prefix+".json", "w") as f:
+            json.dump({"steps_per_octave": STEPS_PER_OCTAVE, "frames": self.frames, "summary": self.summary(),
+                       "buckets": {p: h.counts for p, h in self.hist.items() if h.n}}, f, indent=1)
+        with open(prefix+".csv", "w", newline="") as f:
+            w = csv.writer(f); w.writerow(("frame",)+self.phases)
+            for frame, row in self.trace:
+                w.writerow((frame,)+tuple(round(row.get(p, 0)/1e3, 1) for p in self.phases))
+        return prefix+".json", prefix+".csv"
@@ -0,0 +1,158 @@
+"""Save files: an append-only binary log of rule actions with periodic snapshots.
+
+Layout: a 32-byte header (magic, version, offset of the latest snapshot),
+then records of `<kind:u8><length:u32><payload>`. Snapshot payloads pickle
+the GameState (people and RNG streams included); action payloads are
+`<opcode:u8><person:i32><cause:u8><time:u8>`, and a night record holds a
+batch of `<person:i32><cause:u8><time:u8>` writes for resolve_night. Loading memory-maps the file,
+jumps to the latest snapshot through the header and replays only the tail,
+so resume time depends on the snapshot interval, not on the game length.
+Every `compact_every` snapshots the log is rewritten as just the latest one,
+so the file stays a few snapshots long however long the game runs.
+"""
+import mmap
+import os
+import pickle
+import struct
+
+from engine import ACTIONS, CAUSES, TIMES, apply_action, resolve_night
+
+MAGIC = b"DNSAVE1\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQ")
+RECORD = struct.Struct("<BI")
+ACTION = struct.Struct("<BiBB")
+ENTRY = struct.Struct("<iBB")
+SNAPSHOT, ACT, NIGHT = 1, 2, 3
+OPCODES = {name: i for i, name in enumerate(ACTIONS)}
+OPNAMES = list(ACTIONS)
+NONE = 255
+
+
+class SaveLog:
+    def __init__(self, path, snapshot_every=64, fresh=False, compact_every=8):
+        self.path = path; self.snapshot_every = snapshot_every; self.since_snapshot = 0
+        self.compact_every = compact_every; self.snapshots = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if fresh or not os.path.exists(path) or os.path.getsize(path) < HEADER.size:
+            with open(path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        self.f = open(path, "r+b")
+        self.f.seek(0, os.SEEK_END)
+
+    def record(self, gs, name, person=None, cause=None, time_str=None):
+        """Log an action that was just applied to `gs`; snapshots every `snapshot_every` actions and each new day."""
+        self._append(ACT, ACTION.pack(OPCODES[name], -1 if person is None else person,
+                                      NONE if cause is None else CAUSES.index(cause),
+                                      NONE if time_str is None else TIMES.index(time_str)))
+        self.since_snapshot += 1
+        if name == "end_of_day" or self.since_snapshot >= self.snapshot_every:
+            self.snapshot(gs)
+        else:
+            self.f.flush()
+
+    def record_night(self, gs, entries):
+        """Log a resolve_night batch of (person index, cause, time_str) that was just applied to `gs`."""
+        self._append(NIGHT, b"".join(ENTRY.pack(i, CAUSES.index(c), TIMES.index(t)) for i, c, t in entries))
+        self.since_snapshot += len(entries)
+        if self.since_snapshot >= self.snapshot_every:
+            self.snapshot(gs)
+        else:
+            self.f.flush()
+
+    def snapshot(self, gs):
+        if self.compact_every and self.snapshots >= self.compact_every:
+            self.compact(gs); return
+        self._snapshot(gs)
+        self.snapshots += 1
+
+    def compact(self, gs):
+        """Replace the log with a single snapshot of `gs` (written aside, then renamed over it)."""
+        self.f.close()
+        tmp = self.path+".tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        self.f = open(tmp, "r+b"); self.f.seek(0, os.SEEK_END)
+        self._snapshot(gs)
+        self.f.close(); os.replace(tmp, self.path)
+        self.f = open(self.path, "r+b"); self.f.seek(0, os.SEEK_END)
+        self.snapshots = 1
+
+    def _snapshot(self, gs):
+        if gs.news.archive is not None: gs.news.archive.flush()
+        off = self._append(SNAPSHOT, pickle.dumps({"gs": gs}, pickle.HIGHEST_PROTOCOL))
+        self.f.flush()
+        self.f.seek(0); self.f.write(HEADER.pack(MAGIC, VERSION, 0, off, 0))
+        self.f.seek(0, os.SEEK_END); self.f.flush()
+        self.since_snapshot = 0
+
+    def _append(self, kind, payload):
+        off = self.f.tell()
+        self.f.write(RECORD.pack(kind, len(payload))); self.f.write(payload)
+        return off
+
+    def truncate(self, end):
+        self.f.truncate(end); self.f.seek(0, os.SEEK_END)
+
+    def close(self):
+        self.f.close()
+
+
+def _restore(buf, off, truncate_archive, archive_path):
+    """(gs, archive held back from it during replay, or None)."""
+    state = pickle.loads(buf[off+RECORD.size:off+RECORD.size+RECORD.unpack_from(buf, off)[1]])
+    gs = state["gs"]; archive = gs.news.archive
+    if archive is not None and archive_path is not None:
+        archive.path, archive.idx_path = archive_path, archive_path+".idx"
+    if archive is None or truncate_archive:
+        if archive is not None: archive.truncate()
+        return gs, None
+    gs.news.archive = None
+    return gs, archive
+
+
+def load(path, replay=True, truncate_archive=False, archive=None):
+    """(gs, end) restored from the latest snapshot; `end` is the offset after the last record applied.
+
+    With replay=False the actions logged after the snapshot are not applied.
+    Loading only reads: the news archive is left as it is on disk and stays
+    detached while the tail replays, so headlines the replay evicts are not
+    archived. A caller that owns the archive (`resume`) passes
+    truncate_archive=True to cut it back to the snapshot and keep it attached.
+    `archive` is a path to use for the news archive instead of the one recorded
+    in the save, for saves that were moved together with their archive.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        magic, version, _, snap, _ = HEADER.unpack_from(buf)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a save file")
+        if not snap:
+            raise ValueError(f"{path}: no snapshot yet")
+        gs, held = _restore(buf, snap, truncate_archive, archive)
+        off = end = snap+RECORD.size+RECORD.unpack_from(buf, snap)[1]
+        while replay and off+RECORD.size <= len(buf):
+            kind, n = RECORD.unpack_from(buf, off)
+            if off+RECORD.size+n > len(buf):
+                break  # torn write at the tail
+            if kind == SNAPSHOT:  # written, but the crash beat the header update
+                gs, held = _restore(buf, off, truncate_archive, archive)
+            elif kind == ACT:
+                op, person, cause, time_i = ACTION.unpack_from(buf, off+RECORD.size)
+                apply_action(gs, OPNAMES[op], None if person < 0 else person,
+                             None if cause == NONE else CAUSES[cause], None if time_i == NONE else TIMES[time_i])
+            elif kind == NIGHT:
+                resolve_night(gs, [(gs.city_people[i], CAUSES[c], TIMES[t])
+                                   for i, c, t in ENTRY.iter_unpack(buf[off+RECORD.size:off+RECORD.size+n])])
+            else:
+                break
+            off = end = off+RECORD.size+n
+    if held is not None: gs.news.archive = held
+    return gs, end
+
+
+def resume(path, replay=True, archive=None, **kw):
+    """Load `path` and reopen it for appending, dropping anything after the restored point."""
+    gs, end = load(path, replay, truncate_archive=True, archive=archive)
+    log = SaveLog(path, **kw)
+    log.truncate(end)
+    return gs, log
@@ -0,0 +1,33 @@
+"""Adaptive frame scheduler: full frame rate while animating, blocking waits while idle."""
+import time
+
+import pygame
+
+
+class FrameScheduler:
+    def __init__(self, fps, clock=None):
+        self.fps = fps; self.clock = clock or pygame.time.Clock()
+        self.busy_frames = 0; self.wakeups = 0; self.timer_wakeups = 0
+        self.idle_wall = 0.0; self.idle_cpu = 0.0
+
+    def events(self, busy, wake_at=None):
+        """Events for the next frame. `wake_at` is the pygame tick an idle wait must end by."""
+        if busy:
+            self.busy_frames += 1
+            self.clock.tick(self.fps)
+            return pygame.event.get()
+        timeout = 0 if wake_at is None else max(1, wake_at-pygame.time.get_ticks())
+        wall, cpu = time.perf_counter(), time.process_time()
+        first = pygame.event.wait(timeout)
+        self.idle_wall += time.perf_counter()-wall; self.idle_cpu += time.process_time()-cpu
+        self.wakeups += 1
+        if first.type == pygame.NOEVENT:
+            self.timer_wakeups += 1
+            return []
+        self.clock.tick()
+        return [first]+pygame.event.get()
+
+    def metrics(self):
+        return {"busy_frames": self.busy_frames, "wakeups": self.wakeups, "timer_wakeups": self.timer_wakeups,
+                "idle_s": round(self.idle_wall, 3), "idle_cpu_s": round(self.idle_cpu, 3),
+                "idle_cpu_pct": round(100*self.idle_cpu/self.idle_wall, 2) if self.idle_wall else 0.0}
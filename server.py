@@ -0,0 +1,304 @@
+"""Headless multi-session game server: many GameStates behind one asyncio HTTP JSON API.
+
+    python server.py --port 8765 --save-dir saves/sessions
+
+    POST   /sessions                  {"seed": 7, "population": 50}  -> {"id", "state"}
+    GET    /sessions/<id>             -> {"state"}
+    GET    /sessions/<id>/people      ?top=18 (shortlist) or ?alive=1  -> {"people": [...]}
+    POST   /sessions/<id>/actions     {"action": "write", "person": 3, "cause": "...", "time": "07:00"}
+    POST   /sessions/<id>/night       {"entries": [{"person": 3, "cause": "...", "time": "07:00"}, ...]}
+    DELETE /sessions/<id>
+    GET    /stats
+
+Actions are the engine's ACTIONS with the same phase rules as the window:
+research and the day actions by Day, `night` to end the day's actions, writes
+by Night (one at a time, or a whole night's batch through resolve_night) and
+`end_of_day` to finish the night. People are addressed by their
+index in the population. Sessions idle for `idle` seconds (or beyond `max_live`)
+are snapshotted to `save_dir` and loaded back on their next request; headlines
+that scroll out of a session's news ring are archived next to its save
+(`<id>.news`).
+"""
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import signal
+import sys
+import time
+import traceback
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+import engine as rules
+import savegame
+from indexes import RankedIndex
+from newsfeed import NewsArchive, NewsFeed
+
+PHASES = {"research": "Day", "study": "Day", "family": "Day", "social": "Day", "patrol": "Day", "eyes": "Day",
+          "night": "Day", "write": "Night", "end_of_day": "Night"}
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+MAX_BODY = 1 << 16
+MAX_POPULATION = 100_000
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message); self.status = status
+
+
+def _is_int(v):
+    return isinstance(v, int) and not isinstance(v, bool)  # JSON true would pass as 1
+
+
+def _parse_int(text, what):
+    try:
+        return int(text)
+    except ValueError:
+        raise HTTPError(400, f"{what} must be an integer") from None
+
+
+def _check_person(gs, person):
+    if not _is_int(person) or not 0 <= person < len(gs.city_people):
+        raise HTTPError(400, "person must be an index into the population")
+
+
+class Session:
+    __slots__ = ("id", "gs", "ranked", "last_used", "actions")
+
+    def __init__(self, sid, gs):
+        self.id = sid; self.gs = gs; self.last_used = time.monotonic(); self.actions = 0
+        self.ranked = RankedIndex(gs.city_people); gs.watchers[:] = [self.ranked]
+
+    def state(self):
+        gs = self.gs
+        return {"id": self.id, "seed": gs.rng.seed, "day": gs.day, "phase": gs.phase, "justice": round(gs.justice, 2),
+                "suspicion": gs.inv.suspicion, "intel": gs.intel_points, "action_points": gs.action_points,
+                "entries_today": gs.entries_today, "have_eyes": gs.have_eyes, "stats": gs.stats,
+                "game_over": gs.inv.game_over(), "finished": gs.inv.game_over() or gs.day > rules.DAYS_LIMIT,
+                "won": not gs.inv.game_over() and gs.justice >= rules.JUSTICE_WIN, "news": gs.news[-5:]}
+
+    def person(self, i):
+        p = self.gs.city_people[i]
+        known = not p.has_alias or p.real_name_known or self.gs.have_eyes
+        return {"index": i, "name": p.name, "city": p.city, "crime": p.crime, "guilt": p.guilt, "notoriety": p.notoriety,
+                "alias": p.has_alias and not known, "intel_req": p.intel_req, "alive": p.alive}
+
+
+class SessionStore:
+    """Live sessions in LRU order; the rest wait on disk as compacted save files."""
+
+    def __init__(self, save_dir="saves/sessions", idle=300.0, max_live=10_000):
+        self.save_dir = save_dir; self.idle = idle; self.max_live = max_live
+        self.live = OrderedDict(); self.evictions = self.loads = 0
+        os.makedirs(save_dir, exist_ok=True)
+
+    def _path(self, sid):
+        return os.path.join(self.save_dir, f"{sid}.dnlog")
+
+    def create(self, seed=None, population=50):
+        sid = secrets.token_hex(6)
+        news = NewsFeed(archive=NewsArchive(os.path.join(self.save_dir, f"{sid}.news"), fresh=True, keep_open=False))
+        s = self.live[sid] = Session(sid, rules.new_game(seed, population, news=news))
+        self._trim()
+        return s
+
+    def get(self, sid):
+        s = self.live.get(sid)
+        if s is None:
+            path = self._path(sid)
+            if not sid.isalnum() or not os.path.exists(path):
+                raise HTTPError(404, f"no session {sid}")
+            gs, _ = savegame.load(path, replay=False, truncate_archive=True)
+            s = self.live[sid] = Session(sid, gs); self.loads += 1
+            self._trim()
+        self.live.move_to_end(sid); s.last_used = time.monotonic()
+        return s
+
+    def delete(self, sid):
+        s = self.get(sid)
+        del self.live[sid]
+        if os.path.exists(self._path(sid)): os.remove(self._path(sid))
+        if s.gs.news.archive is not None: s.gs.news.archive.remove()
+
+    def evict(self, sid):
+        s = self.live.pop(sid)
+        log = savegame.SaveLog(self._path(sid), fresh=True); log.snapshot(s.gs); log.close()
+        self.evictions += 1
+
+    def _trim(self):
+        while len(self.live) > self.max_live:
+            self.evict(next(iter(self.live)))
+
+    def evict_idle(self):
+        cutoff = time.monotonic()-self.idle
+        while self.live:
+            sid, s = next(iter(self.live.items()))
+            if s.last_used > cutoff: break
+            self.evict(sid)
+
+    def close(self):
+        for sid in list(self.live): self.evict(sid)
+
+
+class GameServer:
+    def __init__(self, store):
+        self.store = store; self.requests = self.actions = 0; self.started = time.monotonic()
+
+    def route(self, method, path, query, body):
+        parts = [p for p in path.split("/") if p]
+        if parts == ["stats"] and method == "GET":
+            up = time.monotonic()-self.started
+            return 200, {"live": len(self.store.live), "evictions": self.store.evictions, "loads": self.store.loads,
+                         "requests": self.requests, "actions": self.actions, "uptime_s": round(up, 1),
+                         "actions_per_s": round(self.actions/up, 1) if up else 0.0}
+        if not parts or parts[0] != "sessions" or len(parts) > 3:
+            raise HTTPError(404, f"no route {path}")
+        if len(parts) == 1:
+            if method != "POST": raise HTTPError(405, "use POST /sessions")
+            population, seed = body.get("population", 50), body.get("seed")
+            if not _is_int(population) or not 1 <= population <= MAX_POPULATION: raise HTTPError(400, f"population must be 1..{MAX_POPULATION}")
+            if seed is not None and not _is_int(seed): raise HTTPError(400, "seed must be an integer or null")
+            s = self.store.create(seed, population)
+            return 201, {"id": s.id, "state": s.state()}
+        s = self.store.get(parts[1])
+        if len(parts) == 2:
+            if method == "GET": return 200, {"state": s.state()}
+            if method == "DELETE": self.store.delete(s.id); return 200, {"deleted": s.id}
+            raise HTTPError(405, "use GET or DELETE")
+        if parts[2] == "people" and method == "GET":
+            if "top" in query:
+                top = _parse_int(query["top"][0], "top")
+                if top < 1: raise HTTPError(400, "top must be at least 1")
+                idx = [s.ranked.pos[id(p)] for p in s.ranked.top(top)]
+            else:
+                alive = query.get("alive", ["0"])[0] == "1"
+                idx = [i for i, p in enumerate(s.gs.city_people) if p.alive or not alive]
+            return 200, {"people": [s.person(i) for i in idx]}
+        if parts[2] == "actions" and method == "POST":
+            return 200, self.act(s, body)
+        if parts[2] == "night" and method == "POST":
+            return 200, self.night(s, body)
+        raise HTTPError(404, f"no route {method} {path}")
+
+    @staticmethod
+    def _check(gs, name):
+        if not isinstance(name, str) or name not in PHASES:
+            raise HTTPError(400, f"unknown action {name!r}; expected one of {sorted(PHASES)}")
+        if gs.inv.game_over() or gs.day > rules.DAYS_LIMIT:
+            raise HTTPError(409, "game is finished")
+        if gs.phase != PHASES[name]:
+            raise HTTPError(409, f"{name} is a {PHASES[name]} action; it is {gs.phase}")
+
+    @staticmethod
+    def _write_args(gs, body):
+        person, cause, time_str = body.get("person"), body.get("cause", "heart attack"), body.get("time", "random")
+        _check_person(gs, person)
+        if cause not in rules.CAUSES or time_str not in rules.TIMES:
+            raise HTTPError(400, f"cause must be one of {rules.CAUSES} and time one of {rules.TIMES}")
+        return person, cause, time_str
+
+    def act(self, s, body):
+        gs, name = s.gs, body.get("action")
+        self._check(gs, name)
+        person, cause, time_str = body.get("person"), None, None
+        if name == "write":
+            person, cause, time_str = self._write_args(gs, body)
+        elif name == "research":
+            _check_person(gs, person)
+        result = rules.apply_action(gs, name, person, cause, time_str)
+        s.actions += 1; self.actions += 1
+        return {"result": result, "state": s.state()}
+
+    def night(self, s, body):
+        gs, entries = s.gs, body.get("entries")
+        self._check(gs, "write")
+        if not isinstance(entries, list) or not all(isinstance(e, dict) for e in entries):
+            raise HTTPError(400, "entries must be a list of {person, cause, time} objects")
+        args = [self._write_args(gs, e) for e in entries]
+        results = rules.resolve_night(gs, [(gs.city_people[i], c, t) for i, c, t in args])
+        s.actions += len(args); self.actions += len(args)
+        return {"results": results, "state": s.state()}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, version = (lines[0].split(" ")+["", "", ""])[:3]
+                headers = dict((k.strip().lower(), v.strip()) for k, _, v in (ln.partition(":") for ln in lines[1:] if ln))
+                status, payload = 200, None
+                try:
+                    length = _parse_int(headers.get("content-length") or 0, "content-length")
+                    if length < 0: raise HTTPError(400, "bad content-length")
+                    if length > MAX_BODY: raise HTTPError(413, "body too large")
+                    raw = await reader.readexactly(length) if length else b""
+                    try:
+                        body = json.loads(raw) if raw else {}
+                    except ValueError as e:  # JSONDecodeError and UnicodeDecodeError
+                        raise HTTPError(400, f"bad JSON body: {e}") from None
+                    if not isinstance(body, dict): raise HTTPError(400, "body must be a JSON object")
+                    url = urlsplit(target)
+                    self.requests += 1
+                    status, payload = self.route(method, url.path, parse_qs(url.query), body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    traceback.print_exc(file=sys.stderr)
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                data = json.dumps(payload).encode()
+                writer.write(f"{version or 'HTTP/1.1'} {status} {REASONS.get(status, '')}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep else 'close'}\r\n\r\n".encode()+data)
+                await writer.drain()
+                if not keep: break
+        finally:
+            writer.close()
+
+    async def reap(self, every):
+        while True:
+            await asyncio.sleep(every)
+            self.store.evict_idle()
+
+
+async def serve(host="127.0.0.1", port=8765, save_dir="saves/sessions", idle=300.0, max_live=10_000, ready=None):
+    store = SessionStore(save_dir, idle, max_live)
+    app = GameServer(store)
+    server = await asyncio.start_server(app.handle, host, port)
+    reaper = asyncio.create_task(app.reap(min(idle, 30.0)))
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except (NotImplementedError, RuntimeError):  # no signal handlers on this platform/thread
+        pass
+    if ready: ready(server)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        reaper.cancel(); store.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--save-dir", default=os.path.join("saves", "sessions"))
+    ap.add_argument("--idle", type=float, default=300.0, help="seconds before an idle session goes to disk")
+    ap.add_argument("--max-live", type=int, default=10_000, help="sessions kept in memory")
+    args = ap.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.save_dir, args.idle, args.max_live,
+                          ready=lambda s: print(f"listening on {', '.join(str(x.getsockname()) for x in s.sockets)}")))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
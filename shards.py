@@ -0,0 +1,227 @@
+"""Sharded world: each city's residents live in a worker process; a coordinator runs the rules.
+
+Workers own their cities' people (compact, generated in-process from
+(seed, city), so nothing large crosses a pipe) and run the local day tick:
+the night's deaths and research results, patrol leads, and notoriety drift.
+Each tick answers with a small per-city summary (alive and criminal counts
+plus the city's top candidates).
+
+The coordinator keeps one global GameState whose `city_people` is the merged
+shortlist, as plain Person snapshots. The ordinary rule functions
+(`research`, `resolve_write`, `end_of_day`, ...) run on it unchanged, and the
+mutations they report through GameState.update_person are routed back to the
+owning shard with the next tick. Use `ShardedWorld.patrol` instead of
+`engine.patrol`, since a patrol samples the whole world, not the shortlist.
+
+    python shards.py --population 2000000 --days 10 --workers 4
+"""
+import argparse
+import heapq
+import math
+import multiprocessing as mp
+import os
+import random
+import time
+
+import engine as rules
+import simulate
+from newsfeed import NewsArchive, NewsFeed
+
+DRIFT = 0.05  # daily chance that an alive criminal's notoriety moves by one
+TOP_PER_CITY = 18
+
+
+class CityShard:
+    """The residents of one city and their local day tick."""
+
+    def __init__(self, seed, city, n):
+        self.city = city; self.rng = random.Random(f"{seed}:shard:{city}")
+        self.people = rules.gen_population(n, compact=True, rng=self.rng)
+        for p in self.people: p.city = city
+        self.alive = n; self.deaths = 0
+
+    def apply(self, changes):
+        for i, fields in changes:
+            p = self.people[i]
+            if p.alive and not fields.get("alive", True):
+                self.alive -= 1; self.deaths += 1
+            for k, v in fields.items(): setattr(p, k, v)
+
+    def patrol(self, hints):
+        # same odds as engine.patrol, one alive resident per hint
+        people, rng = self.people, self.rng
+        for _ in range(hints if self.alive else 0):
+            p = people[rng.randrange(len(people))]
+            while not p.alive:
+                p = people[rng.randrange(len(people))]
+            if p.is_criminal() and rng.random() < 0.6:
+                p.notoriety = min(10, p.notoriety+1)
+
+    def drift(self):
+        # geometric skips: O(expected changes), not O(residents)
+        people, rng, log_q = self.people, self.rng, math.log(1-DRIFT)
+        i = int(math.log(1-rng.random())/log_q)
+        while i < len(people):
+            p = people[i]
+            if p.alive and p.is_criminal():
+                p.notoriety = max(0, min(10, p.notoriety+rng.choice((-1, 1))))
+            i += 1+int(math.log(1-rng.random())/log_q)
+
+    def summary(self, have_eyes, k):
+        top = heapq.nlargest(k, ((rules.justice_score(p, have_eyes), -i) for i, p in enumerate(self.people) if p.alive))
+        rows = []
+        for _, i in top:
+            p = self.people[-i]
+            rows.append((-i, p.name, p.crime, p.guilt, p.notoriety, p.has_alias, p.intel_req, p.real_name_known))
+        criminals = sum(1 for p in self.people if p.alive and p.is_criminal())
+        return {"alive": self.alive, "criminals": criminals, "deaths": self.deaths, "top": rows}
+
+    def tick(self, changes, hints, have_eyes, k, advance=True):
+        self.apply(changes); self.patrol(hints)
+        if advance: self.drift()
+        return self.summary(have_eyes, k)
+
+
+def _serve(shards, msg):
+    _, work, have_eyes, k, advance = msg
+    return {city: shards[city].tick(*work.get(city, ((), 0)), have_eyes, k, advance) for city in shards}
+
+
+def _worker(conn, seed, cities):
+    shards = {city: CityShard(seed, city, n) for city, n in cities}
+    conn.send(len(shards))
+    while True:
+        msg = conn.recv()
+        if msg[0] == "close": break
+        conn.send(_serve(shards, msg))
+    conn.close()
+
+
+class ShardedWorld:
+    def __init__(self, seed=None, population=100_000, workers=None, shortlist=TOP_PER_CITY, news_archive=None):
+        """`news_archive`: path to archive the headlines that scroll out of the news ring."""
+        self.gs = rules.GameState(rng=rules.RngStreams(seed),
+                                  news=NewsFeed(archive=news_archive and NewsArchive(news_archive, fresh=True)))
+        self.shortlist = shortlist
+        rng = self.gs.rng.population
+        weights = [rng.uniform(0.5, 1.5) for _ in rules.CITIES]
+        sizes = [int(population*w/sum(weights)) for w in weights]
+        sizes[0] += population-sum(sizes)
+        self.sizes = dict(zip(rules.CITIES, sizes))
+        workers = min(len(rules.CITIES), os.cpu_count() or 1) if workers is None else workers
+        groups = [[(c, self.sizes[c]) for j, c in enumerate(rules.CITIES) if j % max(1, workers) == w] for w in range(max(1, workers))]
+        if workers:
+            ctx = mp.get_context()
+            self._conns = []
+            for group in groups:
+                parent, child = ctx.Pipe()
+                ctx.Process(target=_worker, args=(child, self.gs.rng.seed, group), daemon=True).start()
+                self._conns.append(parent)
+            for conn in self._conns: conn.recv()
+            self._local = None
+        else:
+            self._conns = []
+            self._local = {c: CityShard(self.gs.rng.seed, c, n) for c, n in self.sizes.items()}
+        self.workers = workers
+        self._changes = {c: {} for c in rules.CITIES}; self._hints = {c: 0 for c in rules.CITIES}
+        self._where = {}
+        self.gs.watchers.append(self)
+        self._tick(advance=False)
+
+    def person_changed(self, p):
+        loc = self._where.get(id(p))
+        if loc is not None:
+            self._changes[loc[0]][loc[1]] = {"alive": p.alive, "real_name_known": p.real_name_known, "notoriety": p.notoriety}
+
+    def patrol(self):
+        """engine.patrol over the whole world: three leads spread over cities by alive count."""
+        gs = self.gs
+        if gs.action_points <= 0:
+            return "No actions left"
+        gs.action_points -= 1
+        alive = [self.summaries[c]["alive"] for c in rules.CITIES]
+        if sum(alive):
+            for c in gs.rng.patrol.choices(rules.CITIES, weights=alive, k=3): self._hints[c] += 1
+        return "Patrolled forums. Leads hotter."
+
+    def end_day(self):
+        """Send the day's mutations to the shards, tick them, and run the global end_of_day."""
+        rules.end_of_day(self.gs)
+        self._tick()
+
+    def _tick(self, advance=True):
+        work = {c: (list(self._changes[c].items()), self._hints[c]) for c in rules.CITIES}
+        msg = ("tick", work, self.gs.have_eyes, self.shortlist, advance)
+        if self._local is not None:
+            self.summaries = _serve(self._local, msg)
+        else:
+            for conn in self._conns: conn.send(msg)
+            self.summaries = {}
+            for conn in self._conns: self.summaries.update(conn.recv())
+        self._changes = {c: {} for c in rules.CITIES}; self._hints = {c: 0 for c in rules.CITIES}
+        self._refresh()
+
+    def _refresh(self):
+        people, where = [], {}
+        for c in rules.CITIES:
+            for i, name, crime, guilt, notoriety, alias, intel, known in self.summaries[c]["top"]:
+                p = rules.Person(name, c, crime, guilt, notoriety, alias, intel, known)
+                where[id(p)] = (c, i); people.append(p)
+        people.sort(key=lambda p: -rules.justice_score(p, self.gs.have_eyes))
+        self.gs.city_people = people[:self.shortlist]
+        self._where = {id(p): where[id(p)] for p in self.gs.city_people}
+
+    def totals(self):
+        s = self.summaries.values()
+        return {"alive": sum(x["alive"] for x in s), "criminals": sum(x["criminals"] for x in s),
+                "deaths": sum(x["deaths"] for x in s)}
+
+    def close(self):
+        for conn in self._conns:
+            conn.send(("close",)); conn.close()
+        self._conns = []
+        if self.gs.news.archive is not None: self.gs.news.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def play_day(world):
+    """simulate.policy_greedy on the shortlist, with the world-wide patrol."""
+    gs = world.gs
+    targets = simulate._targets(gs)[:6]
+    for p in targets:
+        if not simulate._knows(gs, p):
+            rules.research(gs, p)
+    while gs.action_points > 0:
+        world.patrol() if gs.action_points == 1 else rules.study(gs)
+    rules.begin_night(gs)
+    rules.resolve_night(gs, [(p, *simulate._spread(gs, i))
+                             for i, p in enumerate([p for p in targets if simulate._knows(gs, p)][:rules.MAX_WRITES_PER_DAY])])
+    world.end_day()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--population", type=int, default=400_000)
+    ap.add_argument("--days", type=int, default=10)
+    ap.add_argument("--workers", type=int, help="worker processes (default: one per core, at most one per city; 0 = in-process)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--news-archive", metavar="PATH", help="archive headlines that scroll out of the news ring here")
+    args = ap.parse_args(argv)
+    t0 = time.perf_counter()
+    with ShardedWorld(args.seed, args.population, args.workers, news_archive=args.news_archive) as world:
+        t1 = time.perf_counter()
+        print(f"{args.population} people in {len(rules.CITIES)} cities on {world.workers or 'no'} worker(s): built in {t1-t0:.2f}s")
+        for _ in range(args.days):
+            if world.gs.inv.game_over(): break
+            t = time.perf_counter(); play_day(world)
+            print(f"day {world.gs.day-1:>2}: {(time.perf_counter()-t)*1000:7.1f} ms  justice {world.gs.justice:6.1f}  "
+                  f"suspicion {world.gs.inv.suspicion:3d}  {world.totals()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Headless Monte Carlo runner: plays full games under scripted policies.
+
+    python simulate.py --games 5000 --policy greedy --workers 8
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import engine as rules
+import savegame
+from investigation import Investigation, legacy_detectors, multi_window_detectors
+from newsfeed import NewsArchive, NewsFeed
+
+POPULATION = 50
+DAY_ACTIONS = (rules.study, rules.family, rules.social, rules.patrol)
+
+
+def _targets(gs):
+    alive = [p for p in gs.city_people if p.alive]
+    return sorted(alive, key=lambda p: -rules.justice_score(p, gs.have_eyes))
+
+
+def _knows(gs, p):
+    return not p.has_alias or p.real_name_known or gs.have_eyes
+
+
+def _spread(gs, i):
+    # rotate cause/time so the investigators see as few repeats as possible
+    causes = [c for c in rules.CAUSES if c != "unknown"]
+    times = [t for t in rules.TIMES if t != "random"]
+    return causes[(gs.day*3+i) % len(causes)], times[(gs.day+i) % len(times)]
+
+
+def policy_random(gs):
+    rng = gs.rng.policy
+    alive = [p for p in gs.city_people if p.alive]
+    for p in rng.sample(alive, k=min(2, len(alive))):
+        rules.research(gs, p)
+    while gs.action_points > 0:
+        rng.choice(DAY_ACTIONS)(gs)
+    rules.begin_night(gs)
+    alive = [p for p in gs.city_people if p.alive]
+    picks = rng.sample(alive, k=min(rng.randint(0, rules.MAX_WRITES_PER_DAY), len(alive)))
+    rules.resolve_night(gs, [(p, rng.choice(rules.CAUSES), rng.choice(rules.TIMES)) for p in picks])
+    rules.end_of_day(gs)
+
+
+def policy_greedy(gs):
+    targets = _targets(gs)[:6]
+    for p in targets:
+        if not _knows(gs, p):
+            rules.research(gs, p)
+    while gs.action_points > 0:
+        rules.patrol(gs) if gs.action_points == 1 else rules.study(gs)
+    rules.begin_night(gs)
+    rules.resolve_night(gs, [(p, *_spread(gs, i)) for i, p in enumerate([p for p in targets if _knows(gs, p)][:rules.MAX_WRITES_PER_DAY])])
+    rules.end_of_day(gs)
+
+
+def policy_cautious(gs):
+    targets = [p for p in _targets(gs) if p.guilt >= 6][:4]
+    for p in targets:
+        if not _knows(gs, p):
+            rules.research(gs, p)
+    while gs.action_points > 0:
+        (rules.study, rules.family, rules.social)[gs.action_points % 3](gs)
+    rules.begin_night(gs)
+    budget = 0 if gs.inv.suspicion >= 70 else 1 if gs.inv.suspicion >= 45 else 2
+    rules.resolve_night(gs, [(p, *_spread(gs, i)) for i, p in enumerate([p for p in targets if _knows(gs, p)][:budget])])
+    rules.end_of_day(gs)
+
+
+POLICIES = {"random": policy_random, "greedy": policy_greedy, "cautious": policy_cautious}
+DETECTORS = {"legacy": legacy_detectors, "multi": multi_window_detectors}
+
+
+def play_game(seed, policy="greedy", population=POPULATION, detectors="legacy", save_dir=None):
+    """Play one game; with `save_dir` it snapshots each day and resumes from an existing save.
+
+    Saved games also archive the headlines that scroll out of the news ring (`game-...news`).
+    """
+    path = save_dir and os.path.join(save_dir, f"game-{policy}-{seed}.dnlog")
+    if path and os.path.exists(path):
+        gs, log = savegame.resume(path, replay=False)
+    else:
+        news = NewsFeed(archive=NewsArchive(path[:-len(".dnlog")]+".news", fresh=True) if path else None)
+        gs = rules.new_game(seed, population, news=news, investigation=Investigation(DETECTORS[detectors]()))
+        log = path and savegame.SaveLog(path, fresh=True)
+    step = POLICIES[policy]
+    while gs.day <= rules.DAYS_LIMIT and not gs.inv.game_over():
+        step(gs)
+        if log: log.snapshot(gs)
+    if log:
+        log.compact(gs); log.close()
+        gs.news.archive.close()
+    return (seed, gs.justice, gs.inv.suspicion, gs.day-1, gs.inv.game_over())
+
+
+def _play_chunk(args):
+    seeds, policy, population, detectors, save_dir = args
+    return [play_game(s, policy, population, detectors, save_dir) for s in seeds]
+
+
+def run_batch(games, policy="greedy", workers=None, seed=0, population=POPULATION, chunk=64, detectors="legacy",
+              save_dir=None):
+    workers = workers or os.cpu_count() or 1
+    seeds = range(seed, seed+games)
+    jobs = [(seeds[i:i+chunk], policy, population, detectors, save_dir) for i in range(0, games, chunk)]
+    t0 = time.perf_counter()
+    if workers == 1:
+        results = [r for part in map(_play_chunk, jobs) for r in part]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = [r for part in pool.map(_play_chunk, jobs) for r in part]
+    return results, time.perf_counter()-t0
+
+
+def describe(values):
+    qs = statistics.quantiles(values, n=20) if len(values) > 1 else [values[0]]*19
+    return {"mean": statistics.fmean(values), "stdev": statistics.pstdev(values),
+            "min": min(values), "p5": qs[0], "p50": qs[9], "p95": qs[18], "max": max(values)}
+
+
+def histogram(values, bins=10, width=40):
+    lo, hi = min(values), max(values)
+    step = (hi-lo)/bins or 1
+    counts = [0]*bins
+    for v in values:
+        counts[min(bins-1, int((v-lo)/step))] += 1
+    top = max(counts)
+    return [f"{lo+i*step:8.1f} | {'#'*round(width*c/top):<{width}} {c}" for i, c in enumerate(counts)]
+
+
+def report(results, elapsed, out=sys.stdout):
+    justice = [r[1] for r in results]
+    suspicion = [r[2] for r in results]
+    arrested = sum(1 for r in results if r[4])
+    won = sum(1 for r in results if not r[4] and r[1] >= rules.JUSTICE_WIN)
+    n = len(results)
+    print(f"games: {n}  elapsed: {elapsed:.2f}s  throughput: {n/elapsed:.1f} games/sec", file=out)
+    print(f"won: {won/n:.1%}  arrested: {arrested/n:.1%}  mean days: {statistics.fmean(r[3] for r in results):.1f}", file=out)
+    for label, values in (("justice", justice), ("suspicion", suspicion)):
+        d = describe(values)
+        print(f"\n{label}: " + "  ".join(f"{k}={v:.1f}" for k, v in d.items()), file=out)
+        for line in histogram(values):
+            print("  "+line, file=out)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--games", type=int, default=2000)
+    ap.add_argument("--policy", choices=sorted(POLICIES), default="greedy")
+    ap.add_argument("--workers", type=int, default=0, help="worker processes (default: all cores)")
+    ap.add_argument("--seed", type=int, default=0, help="first seed; game i uses seed+i")
+    ap.add_argument("--population", type=int, default=POPULATION)
+    ap.add_argument("--detectors", choices=sorted(DETECTORS), default="legacy", help="investigation pattern windows")
+    ap.add_argument("--save-dir", help="keep per-game saves here; rerunning resumes unfinished games")
+    args = ap.parse_args(argv)
+    results, elapsed = run_batch(args.games, args.policy, args.workers or None, args.seed, args.population,
+                                 detectors=args.detectors, save_dir=args.save_dir)
+    report(results, elapsed)
+
+
+if __name__ == "__main__":
+    main()
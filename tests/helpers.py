@@ -0,0 +1,39 @@
+import random
+
+import engine
+from timeline import SCALARS
+
+
+def state(gs):
+    """Everything a game's future depends on, as comparable values."""
+    return ([getattr(gs, f) for f in SCALARS], gs.inv.suspicion, gs.stats, gs.confidants, list(gs.news),
+            gs.investigation.deaths, [tuple(getattr(p, f) for f in engine.PERSON_FIELDS) for p in gs.city_people],
+            {name: r.getstate() for name, r in vars(gs.rng).items() if name != "seed"})
+
+
+def random_turn(gs, rng, log=None):
+    """One random legal action (or a night batch), logged to `log` if given."""
+    careful = gs.inv.suspicion >= 50  # lie low so long runs are not cut short by an arrest
+    if gs.phase == "Day":
+        name = rng.choice(["study", "family", "social"] if careful else
+                          ["research", "research", "study", "family", "social", "patrol", "night"])
+        if name != "research" and gs.action_points <= 0: name = "night"
+        i = rng.randrange(len(gs.city_people)) if name == "research" else None
+        engine.apply_action(gs, name, i)
+        if log: log.record(gs, name, i)
+    elif not careful and rng.random() < 0.5 and gs.entries_today < engine.MAX_WRITES_PER_DAY:
+        entries = [(rng.randrange(len(gs.city_people)), rng.choice(engine.CAUSES), rng.choice(engine.TIMES))
+                   for _ in range(rng.randint(1, 3))]
+        engine.resolve_night(gs, [(gs.city_people[i], c, t) for i, c, t in entries])
+        if log: log.record_night(gs, entries)
+    else:
+        engine.apply_action(gs, "end_of_day")
+        if log: log.record(gs, "end_of_day")
+
+
+def play(seed, days, population=40, log=None):
+    gs = engine.new_game(seed, population)
+    rng = random.Random(seed)
+    while gs.day <= days and not gs.inv.game_over():
+        random_turn(gs, rng, log)
+    return gs
@@ -0,0 +1,50 @@
+import copy
+import random
+
+import pytest
+
+import engine
+
+
+def _population_np(gs):
+    np_pop = pytest.importorskip("population_np")
+    gs.city_people = np_pop.Population.from_people(gs.city_people)
+    return gs
+
+
+def _state(gs):
+    return (gs.justice, gs.inv.suspicion, gs.entries_today, list(gs.news), gs.investigation.deaths,
+            [(p.alive, p.notoriety, p.real_name_known) for p in gs.city_people])
+
+
+def _night(seed, population):
+    rng = random.Random(seed)
+    gs = engine.new_game(seed, population)
+    for p in gs.city_people:
+        p.real_name_known = rng.random() < 0.6
+    engine.begin_night(gs)
+    picks = [rng.randrange(population) for _ in range(rng.randint(0, 6))]
+    picks += picks[:rng.randint(0, 2)]  # repeated entries in one batch
+    entries = [(i, rng.choice(engine.CAUSES), rng.choice(engine.TIMES)) for i in picks]
+    return gs, entries
+
+
+@pytest.mark.parametrize("backend", ["list", "numpy"])
+def test_resolve_night_matches_sequential_writes(backend):
+    for seed in range(200):
+        gs, entries = _night(seed, 12)
+        if backend == "numpy": gs = _population_np(gs)
+        seq = copy.deepcopy(gs)
+        batch = engine.resolve_night(gs, [(gs.city_people[i], c, t) for i, c, t in entries])
+        one_by_one = [engine.resolve_write(seq, seq.city_people[i], c, t) for i, c, t in entries]
+        assert batch == one_by_one
+        assert _state(gs) == _state(seq)
+
+
+def test_repeated_person_in_a_batch_dies_once():
+    gs = _population_np(engine.new_game(0, 10))
+    p = gs.city_people[0]; p.real_name_known = True
+    engine.begin_night(gs)
+    msgs = engine.resolve_night(gs, [(gs.city_people[0], "accident", "07:00"), (gs.city_people[0], "fall", "12:00")])
+    assert msgs == ["Name written.", "Already dead"]
+    assert gs.entries_today == 1 and gs.investigation.deaths == 1
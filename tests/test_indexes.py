@@ -0,0 +1,54 @@
+import random
+
+from helpers import play, random_turn
+from indexes import ChunkedSortedList, RankedIndex, SecondaryIndexes
+from timeline import Timeline
+
+
+def _assert_indexes_fresh(gs, ranked, secondary):
+    fresh_r, fresh_s = RankedIndex(gs.city_people), SecondaryIndexes(gs.city_people)
+    assert list(ranked.order) == list(fresh_r.order)
+    nonempty = lambda s: {k: {key: b for key, b in index.buckets.items() if b} for k, index in s.by.items()}
+    assert nonempty(secondary) == nonempty(fresh_s)
+    for f in ({}, {"city": "Osaka"}, {"criminal": True}, {"alias": "unknown"}, {"city": "Kyoto", "criminal": False}):
+        assert list(secondary.select(**f)) == list(fresh_s.select(**f))
+
+
+def test_timeline_rewinds_keep_the_indexes_equal_to_rebuilt_ones():
+    gs = play(6, 1)
+    ranked, secondary = RankedIndex(gs.city_people), SecondaryIndexes(gs.city_people)
+    gs.watchers[:] = [ranked, secondary]
+    tl = Timeline(gs)
+    rng = random.Random(6)
+    for step in range(400):
+        if rng.random() < 0.2:
+            rng.choice([lambda: tl.rewind(rng.randrange(len(tl))), tl.undo])()
+        elif not gs.inv.game_over():
+            random_turn(gs, rng); tl.checkpoint()
+        if step % 20 == 0:
+            _assert_indexes_fresh(gs, ranked, secondary)
+    _assert_indexes_fresh(gs, ranked, secondary)
+
+
+def test_patrol_samples_the_same_people_with_or_without_the_index():
+    plain, indexed = play(8, 1), play(8, 1)
+    indexed.watchers[:] = [SecondaryIndexes(indexed.city_people)]
+    rng_a, rng_b = random.Random(1), random.Random(1)
+    for _ in range(300):
+        if plain.inv.game_over(): break
+        random_turn(plain, rng_a); random_turn(indexed, rng_b)
+    assert [(p.alive, p.notoriety) for p in plain.city_people] == [(p.alive, p.notoriety) for p in indexed.city_people]
+
+
+def test_chunked_sorted_list_matches_a_sorted_list():
+    rng = random.Random(2)
+    items = [rng.randrange(1000) for _ in range(300)]
+    chunked, plain = ChunkedSortedList(items, load=4), sorted(items)
+    for _ in range(3000):
+        if plain and rng.random() < 0.5:
+            v = rng.choice(plain); chunked.remove(v); plain.remove(v)
+        else:
+            v = rng.randrange(1000); chunked.add(v); plain.append(v); plain.sort()
+        assert len(chunked) == len(plain)
+    assert list(chunked) == plain and chunked.head(7) == plain[:7]
+    assert all(0 < len(c) <= 8 for c in chunked.chunks)
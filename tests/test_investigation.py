@@ -0,0 +1,39 @@
+import random
+
+from investigation import Investigation, SlidingCounter
+
+
+def _old_review(memory):
+    # the pre-detector end_of_day rules over the last 7 deaths
+    out = []
+    for slot, msg in ((0, "Investigators note cause pattern: {}"), (1, "Investigators note time pattern: {}"),
+                      (2, "Cluster of deaths in {}")):
+        counts = {}
+        for death in memory: counts[death[slot]] = counts.get(death[slot], 0)+1
+        if counts:
+            key = max(counts, key=counts.get)
+            if counts[key] >= 3: out.append((3, msg.format(key)))
+    return out
+
+
+def test_legacy_detectors_match_old_rules_including_ties():
+    rng = random.Random(0)
+    for _ in range(2000):
+        inv, memory = Investigation(), []
+        for day in range(1, 8):
+            for _ in range(rng.randint(0, 3)):
+                death = (rng.choice("abc"), rng.choice("xyz"), rng.choice("PQR"))
+                inv.record(day, *death); memory = (memory+[death])[-7:]
+            assert inv.review(day) == _old_review(memory)
+
+
+def test_counter_ties_follow_window_order():
+    c = SlidingCounter(entries=3)
+    for k in "aba": c.add(1, k)
+    c.add(1, "b")  # window b, a, b
+    assert c.most_common() == ("b", 2)
+    c.add(1, "a")  # window a, b, a
+    assert c.most_common() == ("a", 2)
+    unbounded = SlidingCounter()
+    for k in "baab": unbounded.add(1, k)
+    assert unbounded.most_common() == ("b", 2)
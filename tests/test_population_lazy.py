@@ -0,0 +1,35 @@
+import gc
+import pickle
+import random
+
+import engine
+from indexes import RankedIndex, SecondaryIndexes
+
+
+def test_lazy_queries_match_the_indexes():
+    gs = engine.new_game(3, 5000, lazy=True); pop = gs.city_people
+    people = list(pop)  # hold everyone so identities are stable
+    ranked, secondary = RankedIndex(people), SecondaryIndexes(people)
+    gs.watchers[:] = [ranked, secondary]
+    rng = random.Random(1)
+    for _ in range(1500):
+        p = rng.choice(people)
+        gs.update_person(p, **rng.choice([{"alive": False}, {"alive": True}, {"notoriety": rng.randint(0, 10)},
+                                           {"real_name_known": True}]))
+    assert [id(p) for p in pop.top(18)] == [id(p) for p in ranked.top(18)]
+    assert list(pop.alive_people()) == list(secondary.alive_people())
+    for f in ({"city": "Osaka"}, {"criminal": True}, {"alias": "known"}, {"city": "Kyoto", "criminal": False, "alias": "unknown"}):
+        expected = sorted(secondary.select(**f), key=lambda p: pop.pos[id(p)])
+        assert [id(p) for p in pop.select(**f)] == [id(p) for p in expected[:len(pop.select(**f))]]
+
+
+def test_only_changed_people_stay_resident_and_survive_pickling():
+    gs = engine.new_game(5, 10_000_000, lazy=True); pop = gs.city_people
+    top = pop.top(18)
+    gs.update_person(top[0], real_name_known=True)
+    engine.begin_night(gs); engine.resolve_write(gs, top[0], "accident", "07:00")
+    del top; gc.collect()
+    assert pop.resident() == len(pop.overlay) == 1
+    back = pickle.loads(pickle.dumps(gs)).city_people
+    assert len(back) == len(pop) and back.overlay.keys() == pop.overlay.keys()
+    assert all(back[i] == pop[i] for i in random.Random(0).sample(range(len(pop)), 200))
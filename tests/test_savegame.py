@@ -0,0 +1,67 @@
+import random
+
+import engine
+import savegame
+from helpers import random_turn, state
+from newsfeed import NewsArchive, NewsFeed
+
+
+def test_load_matches_the_live_game_after_30_days(tmp_path):
+    path = str(tmp_path/"game.dnlog")
+    gs = engine.new_game(11, 40, news=NewsFeed(capacity=8, archive=NewsArchive(str(tmp_path/"news.log"), fresh=True)))
+    log = savegame.SaveLog(path, snapshot_every=7, fresh=True, compact_every=3)
+    log.snapshot(gs)
+    rng = random.Random(11)
+    while gs.day <= 30 and not gs.inv.game_over():
+        random_turn(gs, rng, log)
+        if rng.random() < 0.05:
+            loaded, _ = savegame.load(path)
+            assert state(loaded) == state(gs)
+    assert gs.day > 30
+    loaded, _ = savegame.load(path)
+    assert state(loaded) == state(gs)
+
+
+def test_resume_continues_like_the_uninterrupted_game(tmp_path):
+    path = str(tmp_path/"game.dnlog")
+    gs = engine.new_game(4, 40, news=NewsFeed(capacity=8, archive=NewsArchive(str(tmp_path/"news.log"), fresh=True)))
+    log = savegame.SaveLog(path, snapshot_every=5, fresh=True)
+    log.snapshot(gs)
+    rng = random.Random(4)
+    for _ in range(120):
+        if not gs.inv.game_over(): random_turn(gs, rng, log)
+    log.close()
+    resumed, log2 = savegame.resume(path)
+    assert state(resumed) == state(gs)
+    assert list(resumed.news.archive) == list(gs.news.archive)
+    rng_a, rng_b = random.Random(9), random.Random(9)
+    for _ in range(120):
+        if gs.inv.game_over(): break
+        random_turn(gs, rng_a); random_turn(resumed, rng_b, log2)
+    assert state(resumed) == state(gs)
+    log2.close()
+    assert state(savegame.load(path)[0]) == state(gs)
+
+
+def test_compaction_keeps_the_log_short(tmp_path):
+    path = str(tmp_path/"game.dnlog")
+    gs = engine.new_game(2, 40)
+    log = savegame.SaveLog(path, fresh=True, compact_every=4)
+    sizes = []
+    for _ in range(20):
+        log.snapshot(gs); sizes.append(tmp_path.joinpath("game.dnlog").stat().st_size)
+    assert max(sizes) <= 4*sizes[0]+64
+    assert state(savegame.load(path)[0]) == state(gs)
+
+
+def test_resume_a_moved_save_with_its_moved_archive(tmp_path):
+    gs = engine.new_game(6, 40, news=NewsFeed(capacity=4, archive=NewsArchive(str(tmp_path/"news.log"), fresh=True)))
+    log = savegame.SaveLog(str(tmp_path/"game.dnlog"), fresh=True)
+    for i in range(10): gs.news.append(f"headline {i}")
+    log.snapshot(gs); log.close(); gs.news.archive.close()
+    for name in ("game.dnlog", "news.log", "news.log.idx"):
+        tmp_path.joinpath(name).rename(tmp_path/f"old-{name}")
+    resumed, log2 = savegame.resume(str(tmp_path/"old-game.dnlog"), archive=str(tmp_path/"old-news.log"))
+    log2.close()
+    assert resumed.news.archive.path == str(tmp_path/"old-news.log")
+    assert list(resumed.news.archive) == [f"headline {i}" for i in range(6)]
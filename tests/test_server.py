@@ -0,0 +1,76 @@
+import asyncio
+import json
+
+import pytest
+
+from server import GameServer, HTTPError, SessionStore
+
+
+@pytest.fixture
+def app(tmp_path):
+    store = SessionStore(str(tmp_path))
+    yield GameServer(store)
+    store.close()
+
+
+def _session(app, **body):
+    return app.route("POST", "/sessions", {}, {"seed": 1, "population": 30, **body})[1]["id"]
+
+
+@pytest.mark.parametrize("seed", [{"a": 1}, [1], "7", 1.5, True])
+def test_seed_must_be_int_or_null(app, seed):
+    with pytest.raises(HTTPError) as e:
+        app.route("POST", "/sessions", {}, {"seed": seed})
+    assert e.value.status == 400
+
+
+@pytest.mark.parametrize("population", [True, "50", 50.9, 0])
+def test_population_must_be_an_int_in_range(app, population):
+    with pytest.raises(HTTPError) as e:
+        app.route("POST", "/sessions", {}, {"population": population})
+    assert e.value.status == 400
+
+
+def test_person_rejects_bools_and_top_must_be_positive(app):
+    sid = _session(app)
+    for body in ({"action": "research", "person": True}, {"action": "research", "person": -1}):
+        with pytest.raises(HTTPError) as e:
+            app.route("POST", f"/sessions/{sid}/actions", {}, body)
+        assert e.value.status == 400
+    for top in ("0", "-1", "x"):
+        with pytest.raises(HTTPError) as e:
+            app.route("GET", f"/sessions/{sid}/people", {"top": [top]}, {})
+        assert e.value.status == 400
+    assert len(app.route("GET", f"/sessions/{sid}/people", {"top": ["3"]}, {})[1]["people"]) == 3
+
+
+def _exchange(app, raw):
+    async def go():
+        server = await asyncio.start_server(app.handle, "127.0.0.1", 0)
+        async with server:
+            r, w = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            w.write(raw); await w.drain()
+            head = await r.readuntil(b"\r\n\r\n")
+            n = int(next(ln for ln in head.split(b"\r\n") if ln.lower().startswith(b"content-length")).split(b":")[1])
+            body = json.loads(await r.readexactly(n))
+            w.close()
+            return int(head.split()[1]), body
+    return asyncio.run(go())
+
+
+def test_bad_content_length_is_a_400(app):
+    status, body = _exchange(app, b"GET /stats HTTP/1.1\r\nContent-Length: abc\r\nConnection: close\r\n\r\n")
+    assert status == 400 and "error" in body
+
+
+def test_bad_json_is_a_400(app):
+    status, body = _exchange(app, b"POST /sessions HTTP/1.1\r\nContent-Length: 3\r\nConnection: close\r\n\r\n{x}")
+    assert status == 400 and "JSON" in body["error"]
+
+
+@pytest.mark.parametrize("exc", [KeyError, ValueError, TypeError])
+def test_unexpected_errors_are_a_500(app, monkeypatch, exc):
+    def boom(*a): raise exc("broken")
+    monkeypatch.setattr(app, "route", boom)
+    status, body = _exchange(app, b"GET /stats HTTP/1.1\r\nConnection: close\r\n\r\n")
+    assert status == 500 and exc.__name__ in body["error"]
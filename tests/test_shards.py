@@ -0,0 +1,13 @@
+import shards
+
+
+def _run(workers):
+    with shards.ShardedWorld(3, 4000, workers) as world:
+        for _ in range(4):
+            if world.gs.inv.game_over(): break
+            shards.play_day(world)
+        return world.gs.justice, world.gs.inv.suspicion, world.totals(), [p.name for p in world.gs.city_people]
+
+
+def test_results_do_not_depend_on_the_worker_count():
+    assert _run(0) == _run(2)
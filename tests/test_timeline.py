@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+import engine
+from newsfeed import NewsArchive, NewsFeed
+from timeline import Timeline
+
+
+def _step(gs, rng):
+    if gs.phase == "Day":
+        p = rng.choice(gs.city_people)
+        rng.choice([lambda: engine.research(gs, p), lambda: engine.patrol(gs), lambda: engine.study(gs),
+                    lambda: engine.begin_night(gs)])()
+    elif rng.random() < 0.7:
+        p = rng.choice(gs.city_people); gs.update_person(p, real_name_known=True)
+        engine.resolve_write(gs, p, rng.choice(engine.CAUSES), rng.choice(engine.TIMES))
+    else:
+        engine.end_of_day(gs)
+
+
+def test_rewind_to_any_version_restores_the_news_archive(tmp_path):
+    rng = random.Random(3)
+    gs = engine.new_game(3, 40, news=NewsFeed(capacity=4, archive=NewsArchive(str(tmp_path/"news.log"), fresh=True)))
+    tl = Timeline(gs)
+    recorded = {tl.head: ([], [])}
+    for _ in range(300):
+        if rng.random() < 0.25:
+            vid = rng.randrange(len(tl))
+            tl.rewind(vid)
+            archived, ring = recorded[vid]
+            assert list(gs.news.archive) == archived and list(gs.news) == ring
+            assert gs.news.total() == len(archived)+len(ring)
+        else:
+            _step(gs, rng)
+            if gs.inv.game_over(): gs.inv.suspicion = 0
+            vid = tl.checkpoint("step")
+            recorded[vid] = (list(gs.news.archive), list(gs.news))
+    assert any(len(a) > 10 for a, _ in recorded.values())
+
+
+def test_fork_carries_the_archive_when_given_one(tmp_path):
+    rng = random.Random(5)
+    gs = engine.new_game(5, 40, news=NewsFeed(capacity=4, archive=NewsArchive(str(tmp_path/"news.log"), fresh=True)))
+    tl = Timeline(gs)
+    for _ in range(60):
+        _step(gs, rng); tl.checkpoint()
+    mid = len(tl)//2
+    tl.rewind(mid)
+    expected = list(gs.news.archive)
+    for _ in range(20):
+        _step(gs, rng); tl.checkpoint()
+    fork = tl.fork(mid, archive=NewsArchive(str(tmp_path/"fork.log"), fresh=True))
+    assert list(fork.news.archive) == expected
+    assert tl.fork(mid).news.archive is None
+
+
+def test_rewind_a_numpy_population():
+    population_np = pytest.importorskip("population_np")
+    rng = random.Random(1)
+    gs = engine.new_game(1, 20)
+    gs.city_people = population_np.Population.from_people(gs.city_people)
+    tl = Timeline(gs)
+    people = {tl.head: [p.to_person() for p in gs.city_people]}
+    for _ in range(80):
+        _step(gs, rng)
+        if gs.inv.game_over(): gs.inv.suspicion = 0
+        vid = tl.checkpoint()
+        people[vid] = [p.to_person() for p in gs.city_people]
+    assert people[0] != people[tl.head]
+    for vid in (0, len(tl)//2, tl.head):
+        tl.rewind(vid)
+        assert [p.to_person() for p in gs.city_people] == people[vid]
+    fork = tl.fork(0)
+    assert type(fork.city_people) is population_np.Population
+    assert [p.to_person() for p in fork.city_people] == people[0]
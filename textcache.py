@@ -0,0 +1,33 @@
+"""Bounded LRU cache of rendered text surfaces shared by every widget."""
+from collections import OrderedDict
+
+
+class TextCache:
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize; self.hits = 0; self.misses = 0
+        self._surfs = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surf = self._surfs.get(key)
+        if surf is not None:
+            self.hits += 1
+            self._surfs.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = self._surfs[key] = font.render(text, antialias, color)
+        if len(self._surfs) > self.maxsize:
+            self._surfs.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self._surfs.clear()
+
+    def stats(self):
+        total = self.hits+self.misses
+        return {"size": len(self._surfs), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits/total if total else 0.0}
+
+
+text_cache = TextCache()
+render_text = text_cache.render
@@ -0,0 +1,259 @@
+"""Persistent GameState versions for undo, rewind and what-if forks.
+
+People live in a persistent 32-way vector (`PVector`): a checkpoint copies only
+the people changed since the previous one (reported via
+GameState.update_person) plus the O(log n) path above each, and shares
+everything else with earlier versions. For a lazy population (`population_lazy`)
+versions hold only the people that ever changed (`POverlay`); the rest are
+derived again when read. A NumPy population (`population_np`) hands out a new
+view per read, so its people are tracked by index and snapshotted as plain
+Persons; rewinds write back only the fields that differ (a view's name, city
+and crime are read-only). Scalars, the news ring, the
+investigation windows and the RNG streams are small and copied whole. The
+on-disk news archive is append-only, so each version keeps the few headlines
+archived since its parent; a rewind cuts the archive back to the versions'
+common ancestor and replays those down to the target, which makes redo and
+jumps across branches exact.
+"""
+import copy
+from array import array
+from dataclasses import dataclass
+from typing import Optional
+
+from engine import GameState, Investigator, Person, PERSON_FIELDS
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH-1
+SCALARS = ("day", "phase", "justice", "intel_points", "entries_today", "action_points", "have_eyes")
+
+
+class PVector:
+    """Immutable vector of tuples-of-tuples with path-copying updates."""
+    __slots__ = ("n", "shift", "root")
+
+    def __init__(self, n, shift, root):
+        self.n = n; self.shift = shift; self.root = root
+
+    @classmethod
+    def from_list(cls, items):
+        nodes = [tuple(items[i:i+_WIDTH]) for i in range(0, len(items), _WIDTH)] or [()]
+        shift = 0
+        while len(nodes) > 1:
+            nodes = [tuple(nodes[i:i+_WIDTH]) for i in range(0, len(nodes), _WIDTH)]
+            shift += _BITS
+        return cls(len(items), shift, nodes[0])
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        node = self.root
+        for level in range(self.shift, -1, -_BITS):
+            node = node[(i >> level) & _MASK]
+        return node
+
+    def __iter__(self):
+        return (self[i] for i in range(self.n))
+
+    def set(self, i, v):
+        if not 0 <= i < self.n: raise IndexError(i)
+        return PVector(self.n, self.shift, _set(self.root, self.shift, i, v))
+
+    def diff(self, other):
+        """Indices whose items are not the same object, skipping shared subtrees."""
+        out = []
+        _diff(self.root, other.root, self.shift, 0, out)
+        return out
+
+
+class POverlay:
+    """PVector's interface over a LazyPopulation: changed people are stored, the rest derived on read."""
+    __slots__ = ("base", "items")
+
+    def __init__(self, base, items):
+        self.base = base; self.items = items
+
+    def __len__(self):
+        return len(self.base)
+
+    def __getitem__(self, i):
+        v = self.items.get(i)
+        return Person(*self.base.record(i)) if v is None else v
+
+    def set(self, i, v):
+        if not 0 <= i < len(self.base): raise IndexError(i)
+        return POverlay(self.base, {**self.items, i: v})
+
+    def diff(self, other):
+        return [i for i in self.items.keys() | other.items.keys() if self.items.get(i) is not other.items.get(i)]
+
+    def population(self):
+        """A fresh LazyPopulation of the base's world with these people (copied) as its overlay."""
+        pop = object.__new__(type(self.base))
+        pop.__setstate__({"seed": self.base.seed, "n": len(self.base),
+                          "overlay": {i: copy.copy(p) for i, p in self.items.items()}})
+        return pop
+
+
+def _set(node, shift, i, v):
+    k = (i >> shift) & _MASK
+    child = v if shift == 0 else _set(node[k], shift-_BITS, i, v)
+    return node[:k]+(child,)+node[k+1:]
+
+
+def _diff(a, b, shift, base, out):
+    if a is b: return
+    for k, (x, y) in enumerate(zip(a, b)):
+        if x is y: continue
+        if shift == 0: out.append(base+k)
+        else: _diff(x, y, shift-_BITS, base+(k << shift), out)
+
+
+def _pack_rng(r, prev):
+    version, state, gauss = r.getstate()
+    if prev is not None and prev[2] == gauss and prev[1] == array("I", state):
+        return prev
+    return (version, array("I", state), gauss)
+
+
+@dataclass(frozen=True)
+class Version:
+    id: int
+    parent: Optional[int]
+    label: str
+    scalars: tuple
+    suspicion: int
+    confidants: dict
+    stats: dict
+    people: PVector
+    news: tuple
+    archived: int
+    archive_tail: tuple
+    investigation: object
+    rng: dict
+
+
+class Timeline:
+    """Checkpoints of one live GameState; register once the population is in place."""
+
+    def __init__(self, gs: GameState, label="start"):
+        self.gs = gs
+        self.dirty = set()
+        self.versions = []; self.head = None
+        if hasattr(gs.city_people, "overlay"):  # lazy: track the population's own positions
+            self.pos = gs.city_people.pos
+            self._people = POverlay(gs.city_people, {i: copy.copy(p) for i, p in gs.city_people.overlay.items()})
+        elif hasattr(gs.city_people, "views"):  # NumPy columns: views are fresh objects, so go by their index
+            self.pos = None
+            self._people = PVector.from_list([p.to_person() for p in gs.city_people])
+        else:
+            self.pos = {id(p): i for i, p in enumerate(gs.city_people)}
+            self._people = PVector.from_list([copy.copy(p) for p in gs.city_people])
+        gs.watchers.append(self)
+        self.checkpoint(label)
+
+    def person_changed(self, p):
+        i = p.idx if self.pos is None else self.pos.get(id(p))
+        if i is not None: self.dirty.add(i)
+
+    def _snapshot(self, p):
+        return p.to_person() if self.pos is None else copy.copy(p)
+
+    def checkpoint(self, label=""):
+        """Record the live state as a new version (child of the head) and return its id."""
+        gs = self.gs
+        people = self._people
+        for i in self.dirty:
+            people = people.set(i, self._snapshot(gs.city_people[i]))
+        self.dirty.clear(); self._people = people
+        prev = self.versions[self.head].rng if self.head is not None else {}
+        archive = gs.news.archive
+        archived = len(archive) if archive is not None else 0
+        since = self.versions[self.head].archived if self.head is not None else archived
+        tail = tuple(archive.page(since, archived-since)) if archived > since else ()
+        v = Version(len(self.versions), self.head, label, tuple(getattr(gs, f) for f in SCALARS), gs.inv.suspicion,
+                    dict(gs.confidants), dict(gs.stats), people, tuple(gs.news),
+                    archived, tail, copy.deepcopy(gs.investigation),
+                    {name: _pack_rng(r, prev.get(name)) for name, r in vars(gs.rng).items() if name != "seed"})
+        self.versions.append(v); self.head = v.id
+        return v.id
+
+    def rewind(self, version_id=None):
+        """Restore the live state in place to `version_id` (default: the head) and make it the head."""
+        v = self.versions[self.head if version_id is None else version_id]
+        gs = self.gs
+        changed = set(self.dirty) | set(v.people.diff(self._people))
+        self.dirty.clear()
+        for i in sorted(changed):
+            saved, p = v.people[i], gs.city_people[i]
+            gs.update_person(p, **{f: getattr(saved, f) for f in PERSON_FIELDS if getattr(p, f) != getattr(saved, f)})
+        self.dirty.clear()
+        self._people = v.people
+        self._restore_into(gs, v)
+        archive = gs.news.archive
+        if archive is not None:
+            path = self._path(v.id); base = self._common(path)
+            archive.flush(); archive.count = min(len(archive), self.versions[base].archived); archive.truncate()
+            for vid in path[path.index(base)+1:]:
+                for entry in self.versions[vid].archive_tail: archive.append(entry)
+        self.head = v.id
+        return v.id
+
+    def undo(self):
+        """Back to the head if anything changed since it, otherwise to its parent."""
+        v = self.versions[self.head]
+        if self._changed_since_head() or v.parent is None:
+            return self.rewind(v.id)
+        return self.rewind(v.parent)
+
+    def fork(self, version_id=None, archive=None):
+        """An independent GameState materialized from a version (default: the head).
+
+        The fork's news ring is copied; its older headlines are written to
+        `archive` (an empty NewsArchive) if one is given, else the fork has no archive.
+        """
+        v = self.versions[self.head if version_id is None else version_id]
+        if isinstance(v.people, POverlay): people = v.people.population()
+        elif self.pos is None: people = type(self.gs.city_people).from_people(v.people)
+        else: people = [copy.copy(p) for p in v.people]
+        gs = GameState(city_people=people, rng=copy.deepcopy(self.gs.rng))
+        self._restore_into(gs, v, fork=True)
+        if archive is not None and self.gs.news.archive is not None:
+            path = self._path(v.id); base = self._common(path)
+            for entry in self.gs.news.archive.page(0, self.versions[base].archived): archive.append(entry)
+            for vid in path[path.index(base)+1:]:
+                for entry in self.versions[vid].archive_tail: archive.append(entry)
+            gs.news.archive = archive
+        return gs
+
+    def _path(self, vid):
+        """Version ids from the root down to `vid`."""
+        path = []
+        while vid is not None:
+            path.append(vid); vid = self.versions[vid].parent
+        return path[::-1]
+
+    def _common(self, path):
+        """The deepest version on both `path` and the head's path."""
+        on_head = set(self._path(self.head))
+        return next(vid for vid in reversed(path) if vid in on_head)
+
+    def _changed_since_head(self):
+        gs, v = self.gs, self.versions[self.head]
+        return bool(self.dirty) or tuple(getattr(gs, f) for f in SCALARS) != v.scalars or \
+            gs.inv.suspicion != v.suspicion or gs.stats != v.stats or tuple(gs.news) != v.news
+
+    def _restore_into(self, gs, v, fork=False):
+        for f, val in zip(SCALARS, v.scalars): setattr(gs, f, val)
+        gs.inv = Investigator(v.suspicion)
+        gs.confidants = dict(v.confidants); gs.stats = dict(v.stats)
+        gs.investigation = copy.deepcopy(v.investigation)
+        gs.news = copy.copy(gs.news) if fork else gs.news
+        if fork: gs.news.archive = None
+        gs.news.restore(v.news)
+        for name, (version, state, gauss) in v.rng.items():
+            gs.rng.stream(name).setstate((version, tuple(state), gauss))
+
+    def __len__(self):
+        return len(self.versions)